@@ -30,6 +30,9 @@ except ImportError:
     AgenticInvestigatorV2 = None
     AGENTIC_V2_AVAILABLE = False
 
+# Where investigation reports are written; override for non-root containers and CI
+REPORTS_DIR = os.environ.get("REPORTS_DIR", "/root/reports")
+
 
 class AutonomousMonitor:
     """Autonomous monitor with intelligent issue detection - Chunk 2 implementation."""
@@ -55,9 +58,17 @@ class AutonomousMonitor:
         )
         self.logger = logging.getLogger(__name__)
         
-        # Setup graceful shutdown
-        signal.signal(signal.SIGINT, self._signal_handler)
-        signal.signal(signal.SIGTERM, self._signal_handler)
+        # Create the reports directory once instead of per investigation
+        try:
+            os.makedirs(REPORTS_DIR, exist_ok=True)
+        except OSError as e:
+            self.logger.warning(f"Cannot create reports directory {REPORTS_DIR}: {e}")
+        
+        # Setup graceful shutdown (SIGHUP/SIGQUIT cover terminal close and
+        # orchestrators; neither exists on Windows)
+        for sig_name in ("SIGINT", "SIGTERM", "SIGHUP", "SIGQUIT"):
+            if hasattr(signal, sig_name):
+                signal.signal(getattr(signal, sig_name), self._signal_handler)
     
     def _signal_handler(self, signum, frame):
         """Handle Ctrl+C gracefully."""
@@ -390,7 +401,7 @@ class AutonomousMonitor:
             
             # Create timestamp for report filename
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            report_filename = f"/root/reports/autonomous_report_{timestamp}.txt"
+            report_filename = os.path.join(REPORTS_DIR, f"autonomous_report_{timestamp}.txt")
             
             print(f"📝 Investigation results will be saved to: {report_filename}")
             
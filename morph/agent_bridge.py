@@ -5,13 +5,121 @@ Your agents can import and use this without any changes to their existing code.
 """
 
 import asyncio
-import json
+import atexit
+import itertools
+import logging
+import mmap
+import re
+import shutil
+import sqlite3
 import subprocess
-from typing import Dict, List, Any, Optional, Union
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from typing import AsyncIterator, Awaitable, Dict, Iterable, Iterator, List, Any, Optional, Sequence, Tuple, TypeVar, Union
 from pathlib import Path
 import os
 
-from config import morph_config
+from batcher import DiagnoseBatcher
+from config import WAITING_REASONS, base_pod_name, json_loads, morph_config, read_line_window
+from index import (
+    BINARY_SNIFF_SIZE, TrigramIndex, content_digest, file_digest, in_git_work_tree, is_binary,
+    list_search_files
+)
+
+logger = morph_config.get_logger("morph.bridge")
+
+# httpx talks to the apiserver through a persistent kubectl proxy on a private unix socket
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+T = TypeVar("T")
+
+# Kubernetes namespace names (DNS-1123 labels); anything else never reaches a URL or argv
+_NAMESPACE_RE = re.compile(r"[a-z0-9]([-a-z0-9]{0,61}[a-z0-9])?")
+
+# The only apiserver requests the kubectl proxy forwards: read-only pod listings
+_PROXY_ACCEPT_PATHS = r"^/api/v1/namespaces/[a-z0-9-]+/pods$"
+_PROXY_REJECT_METHODS = "^(POST|PUT|PATCH|DELETE)$"
+
+# Characters that make a grep query a regex rather than a plain literal
+_REGEX_META = frozenset(".^$*+?()[]{}|\\")
+
+# ripgrep --type names for the include patterns agents commonly send
+_RG_TYPES = {
+    "*.py": "py",
+    "*.yaml": "yaml",
+    "*.yml": "yaml",
+    "*.sh": "sh",
+    "*.json": "json",
+}
+
+# git grep pathspecs leaving out hidden files and dirs, which rg skips too
+_GIT_GREP_HIDDEN_EXCLUDES = (":(exclude,glob)**/.*", ":(exclude,glob)**/.*/**")
+
+# Truncate matched lines so minified files don't flood agent context
+_MAX_COLUMNS = 150
+
+# Number of files kept decoded in memory by read_file
+_READ_CACHE_SIZE = 64
+
+# StreamReader line limit for search output; minified lines overrun the 64 KiB default
+_STREAM_LIMIT = 16 * 1024 * 1024
+
+# Directory entries scanned per executor hop in list_directory
+_LIST_CHUNK_SIZE = 500
+
+# How long the set of existing config files is trusted before rescanning
+_CONFIG_PATHS_TTL = 5.0
+
+# edit_file snippets applied to the demo deployment script
+_IMAGE_PULL_FIX_SNIPPET = """
+# ... existing code ...
+        image: nginx:1.21  # Fixed from nginx:nonexistent-tag-12345
+# ... existing code ...
+                """
+
+# Literals present in the deployment script only while the bug is still there
+_IMAGE_PULL_BUG_MARKER = "nginx:nonexistent-tag-12345"
+_CRASH_LOOP_BUG_MARKER = "exit 1"
+
+_CRASH_LOOP_FIX_SNIPPET = """
+# ... existing code ...
+        args: ["-c", "echo 'Application starting successfully...' && sleep 3600"]  # Fixed: removed exit 1
+# ... existing code ...
+                """
+
+# Kubernetes-specific tools offered on top of the base MorphLLM tools
+_K8S_TOOLS: Tuple[Dict[str, Any], ...] = tuple([
+    {
+        "name": "diagnose_k8s_issue",
+        "description": "Diagnose a Kubernetes pod issue using MorphLLM analysis",
+        "parameters": {
+            "properties": {
+                "pod_name": {"type": "string", "description": "Name of the pod to diagnose"},
+                "namespace": {"type": "string", "description": "Kubernetes namespace", "default": "default"}
+            },
+            "required": ["pod_name"]
+        }
+    },
+    {
+        "name": "fix_k8s_issue",
+        "description": "Fix a Kubernetes issue using MorphLLM tools",
+        "parameters": {
+            "properties": {
+                "issue_type": {"type": "string", "description": "Type of issue (ImagePullBackOff, CrashLoopBackOff, etc.)"},
+                "pod_name": {"type": "string", "description": "Name of the pod to fix"},
+                "namespace": {"type": "string", "description": "Kubernetes namespace", "default": "default"}
+            },
+            "required": ["issue_type", "pod_name"]
+        }
+    }
+])
 
 class MorphLLMBridge:
     """
@@ -19,10 +127,52 @@ class MorphLLMBridge:
     without changing their implementation
     """
     
+    __slots__ = (
+        "config", "tools", "_agent_tools", "_deploy_script_path", "_index", "_index_unavailable", "_index_lock",
+        "_read_cache", "_read_lock",
+        "_existing_config_paths", "_existing_config_paths_at", "_loop",
+        "_pod_status_batcher", "_kubectl_proxy", "_proxy_socket", "_http"
+    )
+    
     def __init__(self):
         self.config = morph_config
         self.tools = self.config.get_morph_tools()
+        self._agent_tools = self.tools + _K8S_TOOLS
+        self._deploy_script_path = f"{self.config.kubernetes_manifests_dir}/deploy-demo-apps.sh"
+        # Trigram index over the manifests dir, opened on the first search
+        self._index: Optional[TrigramIndex] = None
+        self._index_unavailable = False
+        self._index_lock = threading.Lock()
+        
+        # LRU of decoded file contents keyed by path
+        self._read_cache: "OrderedDict[str, _CachedFile]" = OrderedDict()
+        # Fix paths read on the caller's thread while tools read on the loop thread
+        self._read_lock = threading.Lock()
+        
+        # Files present in the manifests/agent-actions dirs, refreshed on a TTL
+        self._existing_config_paths: set = set()
+        self._existing_config_paths_at = float("-inf")
+        
+        # One long-lived event loop serves every synchronous wrapper call
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(
+            target=self._loop.run_forever, name="morph-bridge-loop", daemon=True
+        ).start()
+        atexit.register(self._loop.call_soon_threadsafe, self._loop.stop)
+        
+        # Concurrent diagnose calls share one pod listing per namespace
+        self._pod_status_batcher = DiagnoseBatcher(self._list_pod_statuses)
+        
+        # Pod lookups go over keep-alive HTTP to a kubectl proxy when possible;
+        # proxy and client are both started on the first lookup
+        self._kubectl_proxy: Optional[subprocess.Popen] = None
+        self._proxy_socket: Optional[str] = None
+        self._http = None
         
+    def _run(self, coro: Awaitable[T]) -> T:
+        """Run a coroutine on the bridge's event loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+    
     # Synchronous wrapper methods for easy integration with existing agents
     def read_file(self, target_file: str, explanation: str, 
                   start_line: Optional[int] = None, 
@@ -30,34 +180,34 @@ class MorphLLMBridge:
         """
         Read file contents - synchronous wrapper for existing agents
         """
-        return asyncio.run(self._async_read_file(target_file, explanation, start_line, end_line))
+        return self._run(self._async_read_file(target_file, explanation, start_line, end_line))
     
     def search_codebase(self, query: str, explanation: str, 
                        target_directories: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         Search codebase for relevant snippets - synchronous wrapper
         """
-        return asyncio.run(self._async_search_codebase(query, explanation, target_directories))
+        return self._run(self._async_search_codebase(query, explanation, target_directories))
     
     def grep_search(self, query: str, explanation: str, 
                    include_pattern: str = "*.py") -> Dict[str, Any]:
         """
         Fast grep search - synchronous wrapper
         """
-        return asyncio.run(self._async_grep_search(query, explanation, include_pattern))
+        return self._run(self._async_grep_search(query, explanation, include_pattern))
     
     def edit_file(self, target_file: str, edit_snippet: str, 
                   explanation: str) -> bool:
         """
         Edit file with precise changes - synchronous wrapper
         """
-        return asyncio.run(self._async_edit_file(target_file, edit_snippet, explanation))
+        return self._run(self._async_edit_file(target_file, edit_snippet, explanation))
     
     def list_directory(self, relative_path: str, explanation: str) -> Dict[str, Any]:
         """
         List directory contents - synchronous wrapper
         """
-        return asyncio.run(self._async_list_directory(relative_path, explanation))
+        return self._run(self._async_list_directory(relative_path, explanation))
     
     # Kubernetes-specific helper methods for your agents
     def diagnose_kubernetes_issue(self, pod_name: str, namespace: str = "default") -> Dict[str, Any]:
@@ -65,35 +215,15 @@ class MorphLLMBridge:
         High-level method to diagnose a specific Kubernetes issue
         Your agents can call this directly
         """
-        print(f"🔍 Diagnosing Kubernetes issue for pod: {pod_name} in namespace: {namespace}")
-        
-        # Step 1: Get pod status
-        pod_status = self._get_pod_status(pod_name, namespace)
-        
-        # Step 2: Search for deployment files
-        deployment_search = self.search_codebase(
-            query=f"name: {pod_name.split('-')[0]}",
-            explanation=f"Finding deployment configuration for {pod_name}"
-        )
-        
-        # Step 3: Read relevant configuration files
-        config_files = self._find_relevant_config_files(pod_name)
-        config_content = {}
-        for file_path in config_files:
-            if os.path.exists(file_path):
-                config_content[file_path] = self.read_file(
-                    target_file=file_path,
-                    explanation=f"Reading configuration for {pod_name}"
-                )
-        
-        return {
-            "pod_name": pod_name,
-            "namespace": namespace,
-            "pod_status": pod_status,
-            "deployment_search": deployment_search,
-            "config_content": config_content,
-            "diagnosis": self._analyze_issue(pod_status, config_content)
-        }
+        return self._run(self._async_diagnose_kubernetes_issue(pod_name, namespace))
+    
+    def diagnose_kubernetes_issues(self, pod_names: Sequence[str],
+                                   namespace: str = "default") -> Dict[str, Dict[str, Any]]:
+        """
+        Diagnose several pods concurrently, keyed by pod name
+        Status lookups of the same namespace share one pod listing
+        """
+        return self._run(self._async_diagnose_kubernetes_issues(pod_names, namespace))
     
     def fix_kubernetes_issue(self, issue_type: str, pod_name: str, 
                            namespace: str = "default") -> Dict[str, Any]:
@@ -101,16 +231,9 @@ class MorphLLMBridge:
         High-level method to fix a Kubernetes issue
         Your agents can call this directly
         """
-        print(f"🔧 Fixing Kubernetes issue: {issue_type} for pod: {pod_name}")
+        logger.debug("🔧 Fixing Kubernetes issue: %s for pod: %s", issue_type, pod_name)
         
-        fix_result = {
-            "issue_type": issue_type,
-            "pod_name": pod_name,
-            "namespace": namespace,
-            "success": False,
-            "actions_taken": [],
-            "error": None
-        }
+        fix_result = _new_fix_result(issue_type, pod_name, namespace)
         
         try:
             if issue_type == "ImagePullBackOff":
@@ -125,54 +248,66 @@ class MorphLLMBridge:
         
         return fix_result
     
-    def get_kubernetes_tools_for_agent(self) -> List[Dict[str, Any]]:
+    def get_kubernetes_tools_for_agent(self) -> Tuple[Dict[str, Any], ...]:
         """
         Return MorphLLM tools formatted for your existing agents
         This allows your agents to use MorphLLM tools in their tool calling
         """
-        # Add Kubernetes-specific tools to the base MorphLLM tools
-        k8s_tools = [
-            {
-                "name": "diagnose_k8s_issue",
-                "description": "Diagnose a Kubernetes pod issue using MorphLLM analysis",
-                "parameters": {
-                    "properties": {
-                        "pod_name": {"type": "string", "description": "Name of the pod to diagnose"},
-                        "namespace": {"type": "string", "description": "Kubernetes namespace", "default": "default"}
-                    },
-                    "required": ["pod_name"]
-                }
-            },
-            {
-                "name": "fix_k8s_issue",
-                "description": "Fix a Kubernetes issue using MorphLLM tools",
-                "parameters": {
-                    "properties": {
-                        "issue_type": {"type": "string", "description": "Type of issue (ImagePullBackOff, CrashLoopBackOff, etc.)"},
-                        "pod_name": {"type": "string", "description": "Name of the pod to fix"},
-                        "namespace": {"type": "string", "description": "Kubernetes namespace", "default": "default"}
-                    },
-                    "required": ["issue_type", "pod_name"]
-                }
-            }
-        ]
-        
-        return self.tools + k8s_tools
+        # Base MorphLLM tools plus the Kubernetes-specific ones, built once in __init__
+        return self._agent_tools
     
     # Private async methods (actual MorphLLM API calls would go here)
+    async def _async_diagnose_kubernetes_issue(self, pod_name: str, namespace: str) -> Dict[str, Any]:
+        """Async implementation of diagnose_kubernetes_issue"""
+        logger.debug("🔍 Diagnosing Kubernetes issue for pod: %s in namespace: %s", pod_name, namespace)
+        
+        # Pod status, deployment search and config reads are independent,
+        # so they all run concurrently
+        config_files = self._find_relevant_config_files(pod_name)
+        pod_status, deployment_search, *contents = await asyncio.gather(
+            self._pod_status_batcher.process(pod_name, namespace),
+            self._async_search_codebase(
+                query=f"name: {base_pod_name(pod_name)}",
+                explanation=f"Finding deployment configuration for {pod_name}"
+            ),
+            *(
+                self._async_read_file(file_path, f"Reading configuration for {pod_name}")
+                for file_path in config_files
+            )
+        )
+        config_content = dict(zip(config_files, contents))
+        
+        return {
+            "pod_name": pod_name,
+            "namespace": namespace,
+            "pod_status": pod_status,
+            "deployment_search": deployment_search,
+            "config_content": config_content,
+            "diagnosis": self._analyze_issue(pod_status, config_content)
+        }
+    
+    async def _async_diagnose_kubernetes_issues(self, pod_names: Sequence[str],
+                                                namespace: str) -> Dict[str, Dict[str, Any]]:
+        """Async implementation of diagnose_kubernetes_issues"""
+        results = await asyncio.gather(*(
+            self._async_diagnose_kubernetes_issue(pod_name, namespace) for pod_name in pod_names
+        ))
+        return dict(zip(pod_names, results))
+    
     async def _async_read_file(self, target_file: str, explanation: str,
                               start_line: Optional[int] = None,
                               end_line: Optional[int] = None) -> str:
         """Async implementation of read_file"""
-        print(f"📖 Reading file: {target_file} - {explanation}")
+        logger.debug("📖 Reading file: %s - %s", target_file, explanation)
         
+        # Disk reads and digests run off the event loop
+        loop = asyncio.get_running_loop()
         try:
-            with open(target_file, 'r') as f:
-                content = f.read()
-                if start_line and end_line:
-                    lines = content.split('\n')
-                    return '\n'.join(lines[start_line-1:end_line])
-                return content
+            if start_line and end_line:
+                return await loop.run_in_executor(
+                    None, self._read_line_range, target_file, start_line, end_line
+                )
+            return await loop.run_in_executor(None, self._read_text_cached, target_file)
         except FileNotFoundError:
             return f"File not found: {target_file}"
         except Exception as e:
@@ -181,51 +316,193 @@ class MorphLLMBridge:
     async def _async_search_codebase(self, query: str, explanation: str,
                                    target_directories: Optional[List[str]] = None) -> Dict[str, Any]:
         """Async implementation of codebase search"""
-        print(f"🔍 Searching codebase: {query} - {explanation}")
+        logger.debug("🔍 Searching codebase: %s - %s", query, explanation)
         
-        # For demo - in production this would call MorphLLM API
-        return {
+        results = []
+        error = None
+        roots = tuple(
+            os.path.join(os.path.abspath(os.path.join(self.config.kubernetes_manifests_dir, d)), "")
+            for d in target_directories or ()
+        )
+        is_literal = not any(c in _REGEX_META for c in query)
+        try:
+            candidates = await self._async_candidate_files(query) if is_literal else None
+            if candidates is None:
+                # Regex, short query or no index: scan the whole tree
+                results = await self._search_paths(query, None, is_literal, None)
+                if roots:
+                    results = [m for m in results if os.path.abspath(m["file"]).startswith(roots)]
+            elif candidates:
+                if roots:
+                    candidates = [p for p in candidates if p.startswith(roots)]
+                if candidates:
+                    results = await self._search_paths(query, None, is_literal, candidates)
+        except Exception as e:
+            error = str(e)
+        
+        # Semantic matches beyond the index would come from the MorphLLM API
+        result = {
             "query": query,
             "explanation": explanation,
-            "results": [],
+            "results": results,
             "directories_searched": target_directories or ["."]
         }
+        if error is not None:
+            result["error"] = error
+        return result
     
     async def _async_grep_search(self, query: str, explanation: str,
                                include_pattern: str = "*.py") -> Dict[str, Any]:
         """Async implementation of grep search"""
-        print(f"🔎 Grep search: {query} - {explanation}")
+        logger.debug("🔎 Grep search: %s - %s", query, explanation)
         
-        # For demo - in production this would call MorphLLM API
-        return {
+        is_literal = not any(c in _REGEX_META for c in query)
+        result = {
             "query": query,
             "explanation": explanation,
             "pattern": include_pattern,
             "matches": []
         }
+        
+        try:
+            candidates = await self._async_candidate_files(query, include_pattern) if is_literal else None
+            if candidates != []:
+                result["matches"] = await self._search_paths(query, include_pattern, is_literal, candidates)
+        except Exception as e:
+            result["error"] = str(e)
+        
+        return result
+    
+    async def _search_paths(self, query: str, include_pattern: Optional[str], is_literal: bool,
+                            paths: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Search the given files (or the whole manifests dir) with the best available tool"""
+        if shutil.which("rg"):
+            return await self._rg_search(query, include_pattern, is_literal, paths)
+        if is_literal:
+            loop = asyncio.get_running_loop()
+            if paths is None:
+                paths = await loop.run_in_executor(None, self._list_search_files, include_pattern)
+            return await loop.run_in_executor(None, _scan_literal, paths, query.encode("utf-8"))
+        if in_git_work_tree(self.config.kubernetes_manifests_dir):
+            return await self._git_grep_search(query, include_pattern, is_literal, paths)
+        
+        pattern = re.compile(query)
+        loop = asyncio.get_running_loop()
+        if paths is None:
+            paths = await loop.run_in_executor(None, self._list_search_files, include_pattern)
+        return await loop.run_in_executor(None, _scan_regex, paths, pattern)
+    
+    def _list_search_files(self, include_pattern: Optional[str]) -> List[str]:
+        """Files of the manifests dir ripgrep would search, filtered by an include pattern"""
+        return [
+            p for p in list_search_files(self.config.kubernetes_manifests_dir)
+            if not include_pattern or fnmatch(os.path.basename(p), include_pattern)
+        ]
+    
+    async def _rg_search(self, query: str, include_pattern: Optional[str], is_literal: bool,
+                         paths: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Run ripgrep over the manifests dir, streaming its JSON output"""
+        args = ["rg", "--json", "-n", f"--max-columns={_MAX_COLUMNS}"]
+        if is_literal:
+            args.append("-F")
+        if paths:
+            # Candidates are already filtered by include_pattern
+            args += ["-e", query, "--", *paths]
+        else:
+            if include_pattern in _RG_TYPES:
+                args.append(f"--type={_RG_TYPES[include_pattern]}")
+            elif include_pattern:
+                args.append(f"--glob={include_pattern}")
+            args += ["-e", query, self.config.kubernetes_manifests_dir]
+        
+        process = await asyncio.create_subprocess_exec(
+            *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+            limit=_STREAM_LIMIT
+        )
+        matches = []
+        while True:
+            line = await process.stdout.readline()
+            if not line:
+                break
+            record = json_loads(line)
+            if record["type"] != "match":
+                continue
+            data = record["data"]
+            matches.append({
+                "file": data["path"].get("text", ""),
+                "line": data["line_number"],
+                "content": data["lines"].get("text", "").rstrip("\n")
+            })
+        await process.wait()
+        return matches
+    
+    async def _git_grep_search(self, query: str, include_pattern: Optional[str], is_literal: bool,
+                               paths: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Fallback search via git grep over tracked and untracked, non-ignored
+        files. It runs from the manifests dir, which limits it to that subtree
+        like rg, and skips hidden files as rg does.
+        """
+        root = self.config.kubernetes_manifests_dir
+        args = ["git", "grep", "--untracked", "-n", "-I", "-F" if is_literal else "-E", "-e", query]
+        if paths:
+            args += ["--", *(os.path.relpath(p, root) for p in paths)]
+        else:
+            # Match the include pattern against basenames at any depth, like rg --glob
+            pathspec = f":(glob)**/{include_pattern}" if include_pattern else "."
+            args += ["--", pathspec, *_GIT_GREP_HIDDEN_EXCLUDES]
+        
+        process = await asyncio.create_subprocess_exec(
+            *args, cwd=root,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+            limit=_STREAM_LIMIT
+        )
+        matches = []
+        while True:
+            line = await process.stdout.readline()
+            if not line:
+                break
+            path, line_number, content = line.decode("utf-8", "replace").split(":", 2)
+            matches.append({
+                "file": os.path.join(root, path),
+                "line": int(line_number),
+                "content": content.rstrip("\n")[:_MAX_COLUMNS]
+            })
+        stderr = await process.stderr.read()
+        # Exit status 1 only means nothing matched
+        if await process.wait() not in (0, 1):
+            raise RuntimeError(
+                f"git grep exited with status {process.returncode}: "
+                f"{stderr.decode('utf-8', 'replace').strip()}"
+            )
+        return matches
     
     async def _async_edit_file(self, target_file: str, edit_snippet: str,
                              explanation: str) -> bool:
         """Async implementation of file editing"""
-        print(f"✏️ Editing file: {target_file} - {explanation}")
-        print(f"Edit snippet:\n{edit_snippet}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("✏️ Editing file: %s - %s\nEdit snippet:\n%s", target_file, explanation, edit_snippet)
         
         # For demo - in production this would call MorphLLM API
+        
+        # Edits within the stat's timestamp granularity would look unchanged
+        if self._index is not None:
+            path = os.path.join(self.config.kubernetes_manifests_dir, target_file)
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(None, self._index.invalidate, path)
+            except sqlite3.Error as e:
+                logger.warning("⚠️ Could not invalidate search index for %s: %s", path, e)
         return True
     
     async def _async_list_directory(self, relative_path: str, explanation: str) -> Dict[str, Any]:
         """Async implementation of directory listing"""
-        print(f"📁 Listing directory: {relative_path} - {explanation}")
+        logger.debug("📁 Listing directory: %s - %s", relative_path, explanation)
         
         try:
-            path = Path(relative_path)
             items = []
-            for item in path.iterdir():
-                items.append({
-                    "name": item.name,
-                    "type": "directory" if item.is_dir() else "file",
-                    "size": item.stat().st_size if item.is_file() else None
-                })
+            async for chunk in self._iter_directory(relative_path):
+                items.extend(chunk)
             
             return {
                 "path": relative_path,
@@ -240,31 +517,216 @@ class MorphLLMBridge:
                 "items": []
             }
     
+    def _lookup_cached_file(self, target_file: str) -> Optional["_CachedFile"]:
+        """
+        Cached entry for a file if its content is unchanged. The stat is compared
+        first; only when it differs is the file re-hashed, so touched-but-identical
+        files stay cached.
+        """
+        stat = os.stat(target_file)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._read_lock:
+            entry = self._read_cache.get(target_file)
+            if entry is None:
+                return None
+            if entry.signature == signature:
+                self._read_cache.move_to_end(target_file)
+                return entry
+        
+        if file_digest(target_file) != entry.digest:
+            return None
+        with self._read_lock:
+            entry.signature = signature
+            if target_file in self._read_cache:
+                self._read_cache.move_to_end(target_file)
+        return entry
+    
+    def _read_text_cached(self, target_file: str) -> str:
+        """Decoded file content, only re-read from disk when the file changed"""
+        entry = self._lookup_cached_file(target_file)
+        if entry is not None:
+            return entry.content
+        
+        stat = os.stat(target_file)
+        data = Path(target_file).read_bytes()
+        content = data.decode("utf-8")
+        if "\r" in content:
+            # Same newline translation as text-mode reads
+            content = content.replace("\r\n", "\n").replace("\r", "\n")
+        
+        with self._read_lock:
+            self._read_cache[target_file] = _CachedFile(
+                (stat.st_mtime_ns, stat.st_size), content_digest(data), content
+            )
+            self._read_cache.move_to_end(target_file)
+            if len(self._read_cache) > _READ_CACHE_SIZE:
+                self._read_cache.popitem(last=False)
+        return content
+    
+    def _read_line_range(self, target_file: str, start_line: int, end_line: int) -> str:
+        """
+        Lines start_line..end_line (1-indexed, inclusive); files not already
+        cached are streamed so only the requested window is kept in memory
+        """
+        entry = self._lookup_cached_file(target_file)
+        if entry is not None:
+            if entry.lines is None:
+                entry.lines = entry.content.split('\n')
+            return '\n'.join(entry.lines[start_line-1:end_line])
+        
+        with open(target_file, encoding="utf-8") as f:
+            return read_line_window(f, start_line, end_line)
+    
+    # Search index helpers
+    def _get_index(self) -> Optional[TrigramIndex]:
+        """The trigram index, opened on first use; None if it can't be opened"""
+        with self._index_lock:
+            if self._index is None and not self._index_unavailable:
+                try:
+                    self._index = TrigramIndex(self.config.index_path)
+                except (sqlite3.Error, OSError) as e:
+                    logger.warning("⚠️ Search index unavailable, falling back to full scans: %s", e)
+                    self._index_unavailable = True
+            return self._index
+    
+    def _candidate_files(self, query: str,
+                         include_pattern: Optional[str] = None) -> Optional[List[str]]:
+        """
+        Files that can contain a literal query, or None when the index can't
+        narrow the search and the whole tree has to be scanned
+        """
+        index = self._get_index()
+        if index is None:
+            return None
+        
+        root = self.config.kubernetes_manifests_dir
+        try:
+            # Stat-compared on every lookup so the candidates are never stale;
+            # only files whose stat changed are re-read
+            index.update(root)
+            candidates = index.candidates(query, root)
+        except (sqlite3.Error, OSError):
+            return None
+        
+        if candidates is None or not include_pattern:
+            return candidates
+        return [p for p in candidates if fnmatch(os.path.basename(p), include_pattern)]
+    
+    async def _async_candidate_files(self, query: str,
+                                     include_pattern: Optional[str] = None) -> Optional[List[str]]:
+        """_candidate_files with the index refresh and SQLite query off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._candidate_files, query, include_pattern)
+    
+    async def _iter_directory(self, path: str) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield directory entries in chunks, scanning each chunk off the event loop"""
+        loop = asyncio.get_running_loop()
+        with os.scandir(path) as entries:
+            while True:
+                chunk = await loop.run_in_executor(None, _scan_chunk, entries, _LIST_CHUNK_SIZE)
+                if not chunk:
+                    return
+                yield chunk
+    
     # Kubernetes-specific helper methods
-    def _get_pod_status(self, pod_name: str, namespace: str) -> Dict[str, Any]:
-        """Get current pod status from Kubernetes"""
+    async def _kubectl_json(self, *args: str) -> Any:
+        """Run kubectl with JSON output without blocking the event loop"""
+        cmd = ["kubectl", *args, "-o", "json"]
+        process = await asyncio.create_subprocess_exec(
+            *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, cmd, stdout, stderr)
+        return json_loads(stdout)
+    
+    def _ensure_kubectl_proxy(self) -> bool:
+        """
+        Start the kubectl proxy on first use; True while it is running.
+        It listens on a unix socket in a private (0700) directory rather than a
+        TCP port, so other local users can't borrow the kube credentials.
+        """
+        if self._kubectl_proxy is not None:
+            return self._kubectl_proxy.poll() is None
+        if httpx is None or not shutil.which("kubectl"):
+            return False
+        
+        socket_dir = tempfile.mkdtemp(prefix="morph-kubectl-")
+        socket_path = os.path.join(socket_dir, "proxy.sock")
         try:
-            result = subprocess.run(
-                ["kubectl", "get", "pod", pod_name, "-n", namespace, "-o", "json"],
-                capture_output=True, text=True, check=True
+            proxy = subprocess.Popen(
+                [
+                    "kubectl", "proxy", f"--unix-socket={socket_path}",
+                    f"--accept-paths={_PROXY_ACCEPT_PATHS}",
+                    f"--reject-methods={_PROXY_REJECT_METHODS}"
+                ],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
             )
-            return json.loads(result.stdout)
-        except subprocess.CalledProcessError:
-            return {"error": f"Pod {pod_name} not found in namespace {namespace}"}
-        except Exception as e:
-            return {"error": str(e)}
+        except OSError:
+            shutil.rmtree(socket_dir, ignore_errors=True)
+            return False
+        atexit.register(shutil.rmtree, socket_dir, ignore_errors=True)
+        atexit.register(proxy.terminate)
+        self._kubectl_proxy = proxy
+        self._proxy_socket = socket_path
+        return True
+    
+    async def _api_get(self, path: str) -> Any:
+        """GET an apiserver path through the kubectl proxy"""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                transport=httpx.AsyncHTTPTransport(uds=self._proxy_socket),
+                base_url="http://kubectl-proxy", timeout=10.0
+            )
+        response = await self._http.get(path)
+        response.raise_for_status()
+        return json_loads(response.content)
+    
+    async def _list_pod_statuses(self, namespace: str) -> Dict[str, Dict[str, Any]]:
+        """Every pod of a namespace keyed by name, from a single API round-trip"""
+        # The namespace comes from tool arguments; keep it to a plain label so it
+        # can't reshape the API path or turn into a kubectl flag
+        if not _NAMESPACE_RE.fullmatch(namespace):
+            raise ValueError(f"Invalid namespace: {namespace!r}")
+        
+        if self._ensure_kubectl_proxy():
+            try:
+                pods = await self._api_get(f"/api/v1/namespaces/{namespace}/pods")
+            except httpx.TransportError:
+                # Proxy still starting up or gone away; kubectl works regardless
+                pods = await self._kubectl_json("get", "pods", "-n", namespace)
+        else:
+            pods = await self._kubectl_json("get", "pods", "-n", namespace)
+        return {pod["metadata"]["name"]: pod for pod in pods.get("items", [])}
     
     def _find_relevant_config_files(self, pod_name: str) -> List[str]:
         """Find configuration files relevant to a pod"""
-        base_name = pod_name.split('-')[0]  # Remove random suffixes
-        
         potential_files = [
             f"{self.config.kubernetes_manifests_dir}/deploy-demo-apps.sh",
             f"{self.config.kubernetes_manifests_dir}/kind-cluster-config.yaml",
             f"{self.config.agent_actions_dir}/diagnose.sh"
         ]
         
-        return [f for f in potential_files if os.path.exists(f)]
+        existing = self._get_existing_config_paths()
+        return [f for f in potential_files if f in existing]
+    
+    def _get_existing_config_paths(self) -> set:
+        """Paths of the files in the config dirs, rescanned at most every few seconds"""
+        now = time.monotonic()
+        if now - self._existing_config_paths_at < _CONFIG_PATHS_TTL:
+            return self._existing_config_paths
+        
+        existing = set()
+        for directory in (self.config.kubernetes_manifests_dir, self.config.agent_actions_dir):
+            try:
+                with os.scandir(directory) as entries:
+                    existing.update(f"{directory}/{entry.name}" for entry in entries if entry.is_file())
+            except OSError:
+                continue
+        
+        self._existing_config_paths = existing
+        self._existing_config_paths_at = now
+        return existing
     
     def _analyze_issue(self, pod_status: Dict[str, Any], 
                       config_content: Dict[str, str]) -> Dict[str, Any]:
@@ -279,62 +741,42 @@ class MorphLLMBridge:
         if "error" in pod_status:
             return analysis
         
-        # Check container statuses
+        # The first container with a recognised waiting reason decides the diagnosis
         container_statuses = pod_status.get("status", {}).get("containerStatuses", [])
         for container in container_statuses:
             waiting = container.get("state", {}).get("waiting", {})
-            if waiting:
-                reason = waiting.get("reason", "Unknown")
-                
-                if reason in ["ImagePullBackOff", "ErrImagePull"]:
-                    analysis.update({
-                        "issue_type": "ImagePullBackOff",
-                        "severity": "High",
-                        "description": f"Cannot pull container image: {waiting.get('message', '')}",
-                        "suggested_fix": "Fix image tag in deployment configuration"
-                    })
-                elif reason == "CrashLoopBackOff":
-                    analysis.update({
-                        "issue_type": "CrashLoopBackOff",
-                        "severity": "High", 
-                        "description": f"Container keeps crashing: {waiting.get('message', '')}",
-                        "suggested_fix": "Fix container command or add proper health checks"
-                    })
+            template = WAITING_REASONS.get(waiting.get("reason"))
+            if template:
+                analysis = {
+                    "issue_type": template["issue_type"],
+                    "severity": template["severity"],
+                    "description": f"{template['description']}: {waiting.get('message', '')}",
+                    "suggested_fix": template["suggested_fix"]
+                }
+                break
         
         return analysis
     
     def _fix_image_pull_error(self, pod_name: str, namespace: str) -> Dict[str, Any]:
         """Fix ImagePullBackOff error"""
-        result = {
-            "issue_type": "ImagePullBackOff",
-            "pod_name": pod_name,
-            "namespace": namespace,
-            "success": False,
-            "actions_taken": [],
-            "error": None
-        }
+        result = _new_fix_result("ImagePullBackOff", pod_name, namespace)
         
         try:
             # For broken-image-app, we know it's in deploy-demo-apps.sh
             if "broken-image" in pod_name:
-                deployment_file = f"{self.config.kubernetes_manifests_dir}/deploy-demo-apps.sh"
+                deployment_file = self._deploy_script_path
                 
-                # Read current content
-                current_content = self.read_file(
-                    target_file=deployment_file,
-                    explanation="Reading deployment script to fix ImagePullBackOff"
-                )
+                # Read current content; skip the edit if a previous run already fixed it
+                current_content = self._read_text_cached(deployment_file)
+                if _IMAGE_PULL_BUG_MARKER not in current_content:
+                    result["success"] = True
+                    result["actions_taken"].append("no-op: already fixed")
+                    return result
                 
                 # Use edit_file to fix the image tag
-                fix_snippet = """
-# ... existing code ...
-        image: nginx:1.21  # Fixed from nginx:nonexistent-tag-12345
-# ... existing code ...
-                """
-                
                 success = self.edit_file(
                     target_file=deployment_file,
-                    edit_snippet=fix_snippet,
+                    edit_snippet=_IMAGE_PULL_FIX_SNIPPET,
                     explanation="Fixing ImagePullBackOff by correcting image tag"
                 )
                 
@@ -350,30 +792,23 @@ class MorphLLMBridge:
     
     def _fix_crash_loop_error(self, pod_name: str, namespace: str) -> Dict[str, Any]:
         """Fix CrashLoopBackOff error"""
-        result = {
-            "issue_type": "CrashLoopBackOff", 
-            "pod_name": pod_name,
-            "namespace": namespace,
-            "success": False,
-            "actions_taken": [],
-            "error": None
-        }
+        result = _new_fix_result("CrashLoopBackOff", pod_name, namespace)
         
         try:
             # For crash-loop-app, we know it's in deploy-demo-apps.sh
             if "crash-loop" in pod_name:
-                deployment_file = f"{self.config.kubernetes_manifests_dir}/deploy-demo-apps.sh"
+                deployment_file = self._deploy_script_path
                 
-                # Use edit_file to fix the crashing command
-                fix_snippet = """
-# ... existing code ...
-        args: ["-c", "echo 'Application starting successfully...' && sleep 3600"]  # Fixed: removed exit 1
-# ... existing code ...
-                """
+                current_content = self._read_text_cached(deployment_file)
+                if _CRASH_LOOP_BUG_MARKER not in current_content:
+                    result["success"] = True
+                    result["actions_taken"].append("no-op: already fixed")
+                    return result
                 
+                # Use edit_file to fix the crashing command
                 success = self.edit_file(
                     target_file=deployment_file,
-                    edit_snippet=fix_snippet,
+                    edit_snippet=_CRASH_LOOP_FIX_SNIPPET,
                     explanation="Fixing CrashLoopBackOff by removing failing exit command"
                 )
                 
@@ -387,5 +822,85 @@ class MorphLLMBridge:
         
         return result
 
+@dataclass
+class _CachedFile:
+    """read_file cache entry; lines is the content split on first ranged read"""
+    signature: Tuple[int, int]
+    digest: bytes
+    content: str
+    lines: Optional[List[str]] = None
+
+def _new_fix_result(issue_type: str, pod_name: str, namespace: str) -> Dict[str, Any]:
+    """Fresh result dict in the shape fix_kubernetes_issue returns"""
+    return {
+        "issue_type": issue_type,
+        "pod_name": pod_name,
+        "namespace": namespace,
+        "success": False,
+        "actions_taken": [],
+        "error": None
+    }
+
+def _scan_literal(paths: Iterable[str], needle: bytes) -> List[Dict[str, Any]]:
+    """grep -F equivalent over mmapped files, one match per line"""
+    matches = []
+    for path in paths:
+        try:
+            with open(path, "rb") as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if is_binary(mm):
+                    continue
+                
+                line_number, counted = 1, 0
+                pos = mm.find(needle)
+                while pos != -1:
+                    line_start = mm.rfind(b"\n", 0, pos) + 1
+                    line_number += mm[counted:line_start].count(b"\n")
+                    counted = line_start
+                    line_end = mm.find(b"\n", pos)
+                    if line_end == -1:
+                        line_end = len(mm)
+                    matches.append({
+                        "file": path,
+                        "line": line_number,
+                        "content": mm[line_start:line_end].decode("utf-8", "replace").rstrip("\r")[:_MAX_COLUMNS]
+                    })
+                    pos = mm.find(needle, line_end + 1)
+        except (OSError, ValueError):
+            # Unreadable or empty (mmap can't map zero bytes) files have no matches
+            continue
+    return matches
+
+def _scan_regex(paths: Iterable[str], pattern: "re.Pattern[str]") -> List[Dict[str, Any]]:
+    """grep -E equivalent over text files, for when neither rg nor git grep can run"""
+    matches = []
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                if is_binary(f.read(BINARY_SNIFF_SIZE)):
+                    continue
+            with open(path, encoding="utf-8", errors="replace") as f:
+                for line_number, line in enumerate(f, 1):
+                    if pattern.search(line):
+                        matches.append({
+                            "file": path,
+                            "line": line_number,
+                            "content": line.rstrip("\r\n")[:_MAX_COLUMNS]
+                        })
+        except OSError:
+            continue
+    return matches
+
+def _scan_chunk(entries: Iterator[os.DirEntry], size: int) -> List[Dict[str, Any]]:
+    """Describe up to size scandir entries using the stat info cached on each DirEntry"""
+    return [
+        {
+            "name": entry.name,
+            "type": "directory" if entry.is_dir(follow_symlinks=False) else "file",
+            "size": entry.stat(follow_symlinks=False).st_size if entry.is_file(follow_symlinks=False) else None
+        }
+        for entry in itertools.islice(entries, size)
+    ]
+
 # Global bridge instance for easy import
 morph_bridge = MorphLLMBridge()
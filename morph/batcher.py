@@ -0,0 +1,97 @@
+"""
+Async request batching for the MorphLLM bridge
+Calls that arrive within a short window are collected and served together,
+so a burst of agent tool calls costs one backend round-trip per batch.
+"""
+
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+
+class AsyncBatcher(ABC):
+    """
+    Queue items until max_batch_size is reached or max_queue_time has passed,
+    then hand them to process_batch in one go
+    """
+
+    max_batch_size = 16
+    max_queue_time = 0.02
+
+    def __init__(self):
+        self._pending: List[Tuple[Tuple[Any, ...], asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def process(self, *item: Any) -> Any:
+        """Submit one item and wait for its result from the batch it lands in"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_queue_time, self._flush)
+
+        return await future
+
+    @abstractmethod
+    async def process_batch(self, batch: List[Tuple[Any, ...]]) -> List[Any]:
+        """Return one result per submitted item, in submission order"""
+
+    def _flush(self) -> None:
+        """Start processing everything queued so far"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[Tuple[Any, ...], asyncio.Future]]) -> None:
+        """Resolve every waiter of a batch with its result (or the batch's error)"""
+        try:
+            results = await self.process_batch([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+class DiagnoseBatcher(AsyncBatcher):
+    """
+    Serves (pod_name, namespace) status lookups with a single pod listing
+    per namespace instead of one kubectl call per pod
+    """
+
+    def __init__(self, list_pods: Callable[[str], Awaitable[Dict[str, Dict[str, Any]]]]):
+        super().__init__()
+        self._list_pods = list_pods
+
+    async def process_batch(self, batch: List[Tuple[Any, ...]]) -> List[Dict[str, Any]]:
+        namespaces = sorted({namespace for _, namespace in batch})
+        listings = await asyncio.gather(
+            *(self._list_pods(namespace) for namespace in namespaces),
+            return_exceptions=True
+        )
+        pods_by_namespace = dict(zip(namespaces, listings))
+
+        results = []
+        for pod_name, namespace in batch:
+            pods = pods_by_namespace[namespace]
+            if isinstance(pods, BaseException):
+                results.append({"error": str(pods)})
+            elif pod_name in pods:
+                results.append(pods[pod_name])
+            else:
+                results.append({"error": f"Pod {pod_name} not found in namespace {namespace}"})
+        return results
@@ -2,9 +2,28 @@
 MorphLLM Configuration for Kubernetes Agentic System
 """
 
+import functools
+import itertools
+import json
+import logging
 import os
+import re
+import sys
 from pathlib import Path
-from typing import Dict, Any, List
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, TextIO, Tuple
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# orjson parses kubectl/ripgrep JSON straight from bytes, several times faster
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
 
 # Load environment variables from .env file
 try:
@@ -16,6 +35,122 @@ except ImportError:
     print("⚠️ python-dotenv not installed. Install with: pip install python-dotenv")
     print("Environment variables will be loaded from system environment only.")
 
+# Patterns that are plain alternations of literals; these match case-insensitively
+# and can also be scanned with an Aho-Corasick automaton
+_K8S_LITERAL_ALTERNATIONS = {
+    "failing_pods": ("ImagePullBackOff", "CrashLoopBackOff", "Error", "Failed"),
+    "pod_errors": ("Error", "Failed", "Pending", "Unknown"),
+}
+
+# Compiled once at import so scanning loops never hit re's compile cache
+_K8S_PATTERNS: Dict[str, "re.Pattern[str]"] = {
+    **{
+        name: re.compile("(" + "|".join(map(re.escape, words)) + ")", re.IGNORECASE)
+        for name, words in _K8S_LITERAL_ALTERNATIONS.items()
+    },
+    **{
+        name: re.compile(pattern)
+        for name, pattern in {
+            "resource_limits": r"(resources:|limits:|requests:)",
+            "deployments": r"(kind:\s*Deployment)",
+            "services": r"(kind:\s*Service)",
+            "configmaps": r"(kind:\s*ConfigMap)",
+            "secrets": r"(kind:\s*Secret)",
+            "ingress": r"(kind:\s*Ingress)",
+            "namespaces": r"(namespace:\s*\w+)",
+            "image_tags": r"(image:\s*[\w\-\.\/]+:[\w\-\.]+)",
+        }.items()
+    },
+}
+
+def _build_automaton(words: Tuple[str, ...]) -> Any:
+    """Aho-Corasick automaton over lowercased words; scan lowercased text with it"""
+    automaton = ahocorasick.Automaton()
+    for word in words:
+        automaton.add_word(word.lower(), word)
+    automaton.make_automaton()
+    return automaton
+
+_K8S_LITERAL_AUTOMATA = (
+    {name: _build_automaton(words) for name, words in _K8S_LITERAL_ALTERNATIONS.items()}
+    if ahocorasick is not None else {}
+)
+
+# Diagnosis per issue type; description prefixes the container's waiting message
+_ISSUE_TEMPLATES: Dict[str, Dict[str, str]] = {
+    "ImagePullBackOff": {
+        "severity": "High",
+        "description": "Cannot pull container image",
+        "suggested_fix": "Fix image tag in deployment configuration"
+    },
+    "CrashLoopBackOff": {
+        "severity": "High",
+        "description": "Container keeps crashing",
+        "suggested_fix": "Fix container command or add proper health checks"
+    }
+}
+
+# Container waiting reason -> diagnosis of the issue it indicates; reasons
+# not listed aren't reported
+WAITING_REASONS: Mapping[str, Mapping[str, str]] = MappingProxyType({
+    reason: MappingProxyType({"issue_type": issue_type, **_ISSUE_TEMPLATES[issue_type]})
+    for reason, issue_type in {
+        "ImagePullBackOff": "ImagePullBackOff",
+        "ErrImagePull": "ImagePullBackOff",
+        "CrashLoopBackOff": "CrashLoopBackOff",
+    }.items()
+})
+
+# Edit snippets for common Kubernetes fixes, built and interned once at import
+_COMMON_FIXES: Dict[str, str] = {
+    name: sys.intern(snippet)
+    for name, snippet in {
+        "fix_image_tag": """
+# Fix incorrect image tag
+# ... existing code ...
+        image: nginx:1.21  # Fixed from nonexistent-tag
+# ... existing code ...
+            """,
+        "increase_memory": """
+# Increase memory limits for resource pressure
+# ... existing code ...
+        resources:
+          requests:
+            memory: "128Mi"
+            cpu: "100m"
+          limits:
+            memory: "256Mi"  # Increased from 128Mi
+            cpu: "200m"
+# ... existing code ...
+            """,
+        "add_restart_policy": """
+# Add restart policy for crash loops
+# ... existing code ...
+      restartPolicy: Always
+      containers:
+# ... existing code ...
+            """
+    }.items()
+}
+
+def base_pod_name(pod_name: str) -> str:
+    """Pod name up to its first dash, without building a split list"""
+    index = pod_name.find("-")
+    return pod_name if index < 0 else pod_name[:index]
+
+def read_line_window(f: TextIO, start_line: int, end_line: int) -> str:
+    """
+    Lines start_line..end_line (1-indexed, inclusive) of a text file, streamed
+    so only the window is kept in memory. Same result as
+    '\\n'.join(content.split('\\n')[start_line-1:end_line]): a window cut short
+    by EOF keeps the file's trailing newline, a full window drops it.
+    """
+    lines = list(itertools.islice(f, start_line - 1, end_line))
+    window = ''.join(lines)
+    if len(lines) == end_line - start_line + 1 and window.endswith('\n'):
+        window = window[:-1]
+    return window
+
 class MorphLLMConfig:
     """Configuration for MorphLLM agent tools integration"""
     
@@ -40,13 +175,64 @@ class MorphLLMConfig:
             "/Users/jade/kubernetes-agentic-swam-yc-hackathon"
         )
         
+        # On-disk trigram index used to narrow literal searches
+        self.index_path = os.getenv(
+            "MORPH_INDEX_PATH",
+            str(Path.home() / ".cache" / "morph" / "trigram.sqlite")
+        )
+        
+        # Route the kubernetes agent's tool wrappers through the MorphLLM API
+        # (off by default: the demo reads and searches the local checkout)
+        self.tools_via_api = os.getenv("MORPH_TOOLS_API", "false").lower() == "true"
+        
         # Optional settings
         self.log_level = os.getenv("LOG_LEVEL", "INFO")
         self.debug_mode = os.getenv("DEBUG_MODE", "false").lower() == "true"
         
-    def get_morph_tools(self) -> List[Dict[str, Any]]:
+        # stderr handler for the morph.* loggers, attached by configure_logging()
+        self._log_handler: Optional[logging.Handler] = None
+        
+    @property
+    def log_level_value(self) -> int:
+        """Numeric level for the morph.* loggers: DEBUG in debug mode, else LOG_LEVEL"""
+        if self.debug_mode:
+            return logging.DEBUG
+        level = logging.getLevelName(self.log_level.upper())
+        return level if isinstance(level, int) else logging.INFO
+    
+    def configure_logging(self) -> None:
+        """
+        Send morph.* log records (tool-call traces, errors) to stderr at the
+        configured level. Entry points call this; safe to call repeatedly.
+        """
+        morph_logger = logging.getLogger("morph")
+        morph_logger.setLevel(self.log_level_value)
+        if self._log_handler is None:
+            self._log_handler = logging.StreamHandler()
+            self._log_handler.setFormatter(logging.Formatter("%(message)s"))
+            morph_logger.addHandler(self._log_handler)
+    
+    def get_logger(self, name: str) -> logging.Logger:
+        """
+        Logger for tool-call tracing; %-style arguments keep formatting off the
+        default (INFO) path. In debug mode library users get traces without
+        any logging setup of their own.
+        """
+        if self.debug_mode:
+            self.configure_logging()
+        return logging.getLogger(name)
+        
+    def get_morph_tools(self) -> Tuple[Dict[str, Any], ...]:
         """Get MorphLLM tool definitions for Kubernetes agents"""
-        return [
+        return self.morph_tools
+    
+    @functools.cached_property
+    def morph_tools(self) -> Tuple[Dict[str, Any], ...]:
+        """
+        MorphLLM tool definitions, built once per config. Plain dicts, since
+        they are sent to LLM APIs as JSON; callers must not mutate them.
+        """
+        return tuple([
             {
                 "name": "read_file",
                 "description": "Read the contents of a file to understand its structure before making edits",
@@ -153,52 +339,27 @@ class MorphLLMConfig:
                     "required": ["target_file", "edit_snippet", "explanation"]
                 }
             }
-        ]
+        ])
     
-    def get_kubernetes_search_patterns(self) -> Dict[str, str]:
-        """Common Kubernetes search patterns for agents"""
-        return {
-            "failing_pods": r"(ImagePullBackOff|CrashLoopBackOff|Error|Failed)",
-            "resource_limits": r"(resources:|limits:|requests:)",
-            "deployments": r"(kind:\s*Deployment)",
-            "services": r"(kind:\s*Service)",
-            "configmaps": r"(kind:\s*ConfigMap)",
-            "secrets": r"(kind:\s*Secret)",
-            "ingress": r"(kind:\s*Ingress)",
-            "namespaces": r"(namespace:\s*\w+)",
-            "image_tags": r"(image:\s*[\w\-\.\/]+:[\w\-\.]+)",
-            "pod_errors": r"(Error|Failed|Pending|Unknown)"
-        }
+    def get_kubernetes_search_patterns(self) -> Dict[str, "re.Pattern[str]"]:
+        """Common Kubernetes search patterns for agents, precompiled"""
+        return _K8S_PATTERNS
+    
+    def get_kubernetes_literal_automata(self) -> Dict[str, Any]:
+        """
+        Aho-Corasick automata for the literal-alternation patterns, for scanning
+        many lines at once; empty when pyahocorasick is not installed
+        """
+        return _K8S_LITERAL_AUTOMATA
     
-    def get_common_fixes(self) -> Dict[str, str]:
+    @functools.cached_property
+    def common_fixes(self) -> Mapping[str, str]:
         """Common Kubernetes fixes that agents can apply"""
-        return {
-            "fix_image_tag": """
-# Fix incorrect image tag
-# ... existing code ...
-        image: nginx:1.21  # Fixed from nonexistent-tag
-# ... existing code ...
-            """,
-            "increase_memory": """
-# Increase memory limits for resource pressure
-# ... existing code ...
-        resources:
-          requests:
-            memory: "128Mi"
-            cpu: "100m"
-          limits:
-            memory: "256Mi"  # Increased from 128Mi
-            cpu: "200m"
-# ... existing code ...
-            """,
-            "add_restart_policy": """
-# Add restart policy for crash loops
-# ... existing code ...
-      restartPolicy: Always
-      containers:
-# ... existing code ...
-            """
-        }
+        return MappingProxyType(_COMMON_FIXES)
+    
+    def get_common_fix(self, name: str) -> str:
+        """Look up a single common fix by name"""
+        return _COMMON_FIXES[name]
 
 # Global config instance
 morph_config = MorphLLMConfig()
@@ -17,6 +17,7 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from kubernetes_agent import MorphKubernetesAgent, KubernetesIssue
+from config import morph_config
 
 async def demo_morph_kubernetes_integration():
     """
@@ -212,4 +213,5 @@ async def main():
         print(f"\n❌ Demo error: {e}")
 
 if __name__ == "__main__":
+    morph_config.configure_logging()
     asyncio.run(main())
@@ -0,0 +1,264 @@
+"""
+Trigram Index for MorphLLM search tools
+Keeps an on-disk trigram -> file posting list for the project tree so literal
+searches only re-scan the handful of files that can actually match.
+"""
+
+import hashlib
+import mmap
+import os
+import shutil
+import sqlite3
+import subprocess
+import threading
+from pathlib import Path
+from typing import Iterator, List, Optional, Set, Union
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# Build output and dependency trees a .gitignore would normally exclude;
+# only consulted when neither ripgrep nor git can list the files
+_FALLBACK_SKIPPED_DIRS = frozenset({"node_modules", "__pycache__", "dist", "build", "venv"})
+
+# Larger files get no postings and are returned as candidates for every query
+MAX_FILE_SIZE = 1 << 20
+
+# Same binary-file heuristic as grep: a NUL byte near the start
+BINARY_SNIFF_SIZE = 8192
+
+# SQLite caps compound SELECTs at 500 terms; any subset of a query's
+# trigrams still yields a superset of the matching files
+MAX_QUERY_TRIGRAMS = 64
+
+# Bumped whenever _SCHEMA changes; older index files are rebuilt from scratch
+_SCHEMA_VERSION = 4
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    digest BLOB NOT NULL,
+    oversize INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS postings (
+    trigram BLOB NOT NULL,
+    file_id INTEGER NOT NULL,
+    PRIMARY KEY (trigram, file_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_file ON postings (file_id);
+"""
+
+
+def content_digest(data: Union[bytes, mmap.mmap]) -> bytes:
+    """64-bit content hash (XXH3 when xxhash is installed, else BLAKE2b)"""
+    if xxhash is not None:
+        return xxhash.xxh3_64_digest(data)
+    return hashlib.blake2b(data, digest_size=8).digest()
+
+
+def file_digest(path: str) -> bytes:
+    """content_digest of a file, hashed straight from an mmap of it"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return content_digest(b"")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return content_digest(mm)
+
+
+def in_git_work_tree(path: str) -> bool:
+    """Whether path lies inside a git checkout"""
+    path = Path(path).resolve()
+    return any((parent / ".git").exists() for parent in (path, *path.parents))
+
+
+def list_search_files(root: str) -> List[str]:
+    """
+    Files under root that a ripgrep directory walk would search: hidden files
+    and anything a .gitignore excludes are left out. Listed with `rg --files`,
+    else `git ls-files`, else a plain walk skipping the usual build dirs.
+    """
+    root = os.path.abspath(root)
+    if shutil.which("rg"):
+        result = subprocess.run(["rg", "--files", "--null", root], capture_output=True)
+        # Exit status 1 only means there were no files to list
+        if result.returncode in (0, 1):
+            return [os.fsdecode(p) for p in result.stdout.split(b"\0") if p]
+
+    if in_git_work_tree(root):
+        result = subprocess.run(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            cwd=root, capture_output=True
+        )
+        if result.returncode == 0:
+            paths = (os.fsdecode(p) for p in result.stdout.split(b"\0") if p)
+            return [
+                os.path.join(root, p) for p in paths
+                if not any(part.startswith(".") for part in p.split("/"))
+                # --cached still lists tracked files deleted from the work tree
+                and os.path.isfile(os.path.join(root, p))
+            ]
+
+    return list(_walk_files(root))
+
+
+def _walk_files(root: str) -> Iterator[str]:
+    """Walk root yielding regular files outside hidden and build dirs"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [
+            d for d in dirnames if d not in _FALLBACK_SKIPPED_DIRS and not d.startswith(".")
+        ]
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            if not name.startswith(".") and os.path.isfile(path):
+                yield path
+
+
+def is_binary(data: Union[bytes, mmap.mmap]) -> bool:
+    """Whether data looks binary (and is skipped by searches)"""
+    return data.find(b"\0", 0, BINARY_SNIFF_SIZE) != -1
+
+
+def trigrams(data: bytes) -> Set[bytes]:
+    """All distinct 3-byte grams of data"""
+    return {data[i:i + 3] for i in range(len(data) - 2)}
+
+
+class TrigramIndex:
+    """
+    SQLite-backed trigram index, rebuilt incrementally per changed file
+    """
+
+    def __init__(self, db_path: str):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+                self._conn.executescript(
+                    "DROP TABLE IF EXISTS postings; DROP TABLE IF EXISTS files;"
+                )
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+    def update(self, root: str) -> None:
+        """
+        Index new or changed files under root and drop deleted ones. The tree
+        is walked without holding the lock; only changed files are written.
+        """
+        prefix = os.path.join(os.path.abspath(root), "")
+        with self._lock:
+            known = {
+                path: (mtime_ns, size)
+                for path, mtime_ns, size in self._conn.execute(
+                    "SELECT path, mtime_ns, size FROM files WHERE substr(path, 1, ?) = ?",
+                    (len(prefix), prefix)
+                )
+            }
+
+        seen = set()
+        changed = []
+        for path in list_search_files(prefix):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            seen.add(path)
+            if known.get(path) != (stat.st_mtime_ns, stat.st_size):
+                changed.append((path, stat))
+        deleted = [path for path in known if path not in seen]
+        if not changed and not deleted:
+            return
+
+        with self._lock, self._conn:
+            for path, stat in changed:
+                self._refresh_file(path, stat)
+            for path in deleted:
+                self._conn.execute(
+                    "DELETE FROM postings WHERE file_id = (SELECT id FROM files WHERE path = ?)",
+                    (path,)
+                )
+                self._conn.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    def invalidate(self, path: str) -> None:
+        """Force the next update to re-read a file, whatever its stat says"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE files SET mtime_ns = -1 WHERE path = ?", (os.path.abspath(path),)
+            )
+
+    def candidates(self, query: str, root: str) -> Optional[List[str]]:
+        """
+        Files under root containing every trigram of a literal query plus
+        the over-size files, or None when the query is too short to narrow
+        anything down
+        """
+        grams = sorted(trigrams(query.encode("utf-8")))[:MAX_QUERY_TRIGRAMS]
+        if not grams:
+            return None
+
+        prefix = os.path.join(os.path.abspath(root), "")
+        intersection = " INTERSECT ".join(
+            ["SELECT file_id FROM postings WHERE trigram = ?"] * len(grams)
+        )
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT path FROM files WHERE (oversize OR id IN ({intersection})) "
+                "AND substr(path, 1, ?) = ? ORDER BY path",
+                (*grams, len(prefix), prefix)
+            ).fetchall()
+        return [path for (path,) in rows]
+
+    def _refresh_file(self, path: str, stat: os.stat_result) -> None:
+        """Bring a single file's entry up to date (caller holds the lock)"""
+        entry = self._conn.execute(
+            "SELECT id, digest, oversize FROM files WHERE path = ?", (path,)
+        ).fetchone()
+        file_id = entry[0] if entry else None
+
+        if stat.st_size > MAX_FILE_SIZE:
+            # Too big to index: listed so every query scans it, never read here
+            self._index_file(path, stat, None, b"", file_id)
+            return
+        try:
+            data = Path(path).read_bytes()
+        except OSError:
+            return
+
+        digest = content_digest(data)
+        if entry and entry[1] == digest and not entry[2]:
+            # Touched but unchanged: refresh the stat, keep the postings
+            self._conn.execute(
+                "UPDATE files SET mtime_ns = ?, size = ? WHERE id = ?",
+                (stat.st_mtime_ns, stat.st_size, file_id)
+            )
+            return
+        self._index_file(path, stat, data, digest, file_id)
+
+    def _index_file(self, path: str, stat: os.stat_result, data: Optional[bytes],
+                    digest: bytes, file_id: Optional[int]) -> None:
+        """Replace the postings of a single file (caller holds the lock)"""
+        oversize = data is None
+        if file_id is None:
+            file_id = self._conn.execute(
+                "INSERT INTO files (path, mtime_ns, size, digest, oversize) VALUES (?, ?, ?, ?, ?)",
+                (path, stat.st_mtime_ns, stat.st_size, digest, oversize)
+            ).lastrowid
+        else:
+            self._conn.execute("DELETE FROM postings WHERE file_id = ?", (file_id,))
+            self._conn.execute(
+                "UPDATE files SET mtime_ns = ?, size = ?, digest = ?, oversize = ? WHERE id = ?",
+                (stat.st_mtime_ns, stat.st_size, digest, oversize, file_id)
+            )
+
+        # Binary files stay listed (so they aren't re-read every update) but unsearchable
+        if oversize or is_binary(data):
+            return
+        self._conn.executemany(
+            "INSERT INTO postings (trigram, file_id) VALUES (?, ?)",
+            ((gram, file_id) for gram in trigrams(data))
+        )
@@ -18,6 +18,7 @@ from adk_agent.config.loader import load_runtime_config
 
 # Import our MorphLLM bridge
 from agent_bridge import morph_bridge
+from config import morph_config
 
 class KubernetesAwareAgent:
     """
@@ -36,6 +37,11 @@ class KubernetesAwareAgent:
         # Get available tools for the agent
         self.available_tools = self.morph_bridge.get_kubernetes_tools_for_agent()
         
+        # The tool list never changes, so its prompt text is built once
+        self._tools_prompt_cache = "".join(
+            f"- {tool['name']}: {tool['description']}\n" for tool in self.available_tools
+        )
+        
     def run_with_k8s_tools(self, system_prompt: str, user_input: str) -> str:
         """
         Enhanced run method that includes MorphLLM tools in the system prompt
@@ -73,24 +79,16 @@ For example:
         """
         print("🔍 Starting comprehensive cluster diagnosis with MorphLLM...")
         
-        # Use MorphLLM bridge to diagnose common issues
-        diagnosis_results = {}
-        
         # Check for common problematic pods
         problematic_pods = ["broken-image-app", "crash-loop-app"]
         
-        for pod_pattern in problematic_pods:
-            print(f"\n📋 Checking for pods matching pattern: {pod_pattern}")
-            
-            # Use MorphLLM to search for and diagnose issues
-            diagnosis = self.morph_bridge.diagnose_kubernetes_issue(
-                pod_name=pod_pattern,
-                namespace="frontend"  # Your demo apps are in frontend namespace
-            )
-            
-            diagnosis_results[pod_pattern] = diagnosis
+        print(f"\n📋 Checking for pods matching patterns: {', '.join(problematic_pods)}")
         
-        return diagnosis_results
+        # Use MorphLLM to search for and diagnose issues, all patterns at once
+        return self.morph_bridge.diagnose_kubernetes_issues(
+            problematic_pods,
+            namespace="frontend"  # Your demo apps are in frontend namespace
+        )
     
     def auto_fix_issues(self, diagnosis_results: dict) -> dict:
         """
@@ -118,10 +116,7 @@ For example:
     
     def _format_tools_for_prompt(self) -> str:
         """Format available tools for inclusion in system prompt"""
-        tools_text = ""
-        for tool in self.available_tools:
-            tools_text += f"- {tool['name']}: {tool['description']}\n"
-        return tools_text
+        return self._tools_prompt_cache
     
     def _process_tool_calls(self, response: str) -> str:
         """
@@ -210,4 +205,5 @@ You have access to MorphLLM tools for precise code analysis and editing.
         print("   Check OPENROUTER_API_KEY in your environment")
 
 if __name__ == "__main__":
+    morph_config.configure_logging()
     demo_integration()
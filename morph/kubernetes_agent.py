@@ -3,19 +3,126 @@ MorphLLM-powered Kubernetes Diagnostic and Repair Agent
 """
 
 import asyncio
-import json
+import logging
+import os
+import re
 import subprocess
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, Iterator, List, Any, Optional, Tuple
+from dataclasses import dataclass, replace
+from itertools import groupby
+from operator import attrgetter
+from string import Template
 from datetime import datetime
 
-from config import morph_config
+from config import WAITING_REASONS, base_pod_name, json_loads, morph_config, read_line_window
 
-@dataclass
+logger = morph_config.get_logger("morph.agent")
+
+# Optional async Kubernetes client; kubectl is used when it isn't installed
+try:
+    from kubernetes_asyncio import client as k8s_client, config as k8s_config, watch as k8s_watch
+except ImportError:
+    k8s_client = k8s_config = k8s_watch = None
+
+# Apiserver rejections plus transport failures (aiohttp ships with kubernetes_asyncio)
+if k8s_client is not None:
+    import aiohttp
+    _API_ERRORS = (k8s_client.ApiException, aiohttp.ClientError)
+else:
+    _API_ERRORS = ()
+
+# Shared keep-alive client for MorphLLM tool calls; HTTP/2 needs the h2 extra
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+# Upper bound on per-issue analyses in flight at once
+_MAX_CONCURRENT_ANALYSES = 16
+
+# edit_file snippets per issue type, parsed once; planners substitute the values
+_FIX_TEMPLATES: Dict[str, Template] = {
+    "ImagePullBackOff": Template("""
+# ... existing code ...
+        image: $image  # Fixed from nonexistent image tag
+# ... existing code ...
+        """),
+    "CrashLoopBackOff": Template("""
+# ... existing code ...
+        command: $command
+        args: $args  # Fixed: removed exit 1
+# ... existing code ...
+        """),
+}
+
+# Replacement values used by the demo fixes
+_FIXED_IMAGE = "nginx:1.21"
+_LONG_RUNNING_COMMAND = '["/bin/sh"]'
+_LONG_RUNNING_ARGS = '["-c", "echo \'Application starting successfully...\' && sleep 3600"]'
+
+# Deployment files that embed their manifests in heredocs rather than being YAML
+_SCRIPT_SUFFIXES = (".sh", ".bash")
+
+# A heredoc body (`cat <<EOF | kubectl apply -f -` in the deploy scripts)
+_HEREDOC_RE = re.compile(r"<<-?\s*['\"]?(\w+)['\"]?[^\n]*\n(.*?)^\1$", re.S | re.M)
+
+# Separator between documents of a multi-document YAML stream
+_YAML_DOC_SEP_RE = re.compile(r"^---\s*$", re.M)
+
+# edit_file marker for unchanged code between hunks
+_ELISION_MARKER = "# ... existing code ..."
+
+# MorphLLM tool call timeout (seconds) and connection pool size
+_MORPH_TIMEOUT = 30.0
+_MORPH_MAX_CONNECTIONS = 32
+
+# How long apply_fix waits for a replacement pod to become ready (matches
+# the kubectl wait timeout in deploy-demo-apps.sh)
+_POD_READY_TIMEOUT = 180.0
+
+# Polling backoff bounds (seconds) when no watch is available
+_POLL_INITIAL_DELAY = 1.0
+_POLL_MAX_DELAY = 30.0
+
+# Server-side timeout (seconds) after which the informer re-opens its watch
+_WATCH_TIMEOUT = 300
+
+# Pods worth scanning for issues. Running can't be excluded: a pod whose
+# container is in CrashLoopBackOff still reports phase Running.
+_UNHEALTHY_POD_SELECTOR = "status.phase!=Succeeded"
+
+# Phases whose containers can't be waiting on a pull or crash loop (mirrors
+# the field selector for pods that reach _waiting_containers unfiltered)
+_SETTLED_PHASES = frozenset({"Succeeded"})
+
+# kubectl fallback projection: one tab-separated line per pod holding its
+# name, namespace, the fields _pod_workload reads and a (reason, message)
+# pair per container, so only what _check_cluster_status needs is
+# serialized and parsed
+_WAITING_JSONPATH = (
+    '{range .items[*]}{.metadata.name}{"\\t"}{.metadata.namespace}'
+    '{"\\t"}{.metadata.ownerReferences[*].kind}{"\\t"}{.metadata.ownerReferences[*].name}'
+    '{"\\t"}{.metadata.labels.pod-template-hash}{"\\t"}{.metadata.labels.app}'
+    '{range .status.containerStatuses[*]}{"\\t"}{.state.waiting.reason}{"\\t"}{.state.waiting.message}{end}'
+    '{"\\n"}{end}'
+)
+
+# (pod_name, namespace, workload, waiting reason, waiting message)
+WaitingContainer = Tuple[str, str, str, str, str]
+
+@dataclass(slots=True, frozen=True)
 class KubernetesIssue:
     """Represents a detected Kubernetes issue"""
     pod_name: str
     namespace: str
+    workload: str
     status: str
     issue_type: str
     description: str
@@ -23,6 +130,14 @@ class KubernetesIssue:
     detected_at: datetime
     suggested_fix: Optional[str] = None
 
+@dataclass(slots=True, frozen=True)
+class EditPlan:
+    """A pending edit_file call that fixes one issue"""
+    target_file: str
+    snippet: str
+    issue: KubernetesIssue
+    explanation: str
+
 class MorphKubernetesAgent:
     """
     Kubernetes agent powered by MorphLLM tools for intelligent diagnosis and repair
@@ -32,7 +147,41 @@ class MorphKubernetesAgent:
         self.config = morph_config
         self.tools = self.config.get_morph_tools()
         self.search_patterns = self.config.get_kubernetes_search_patterns()
-        self.common_fixes = self.config.get_common_fixes()
+        self.common_fixes = self.config.common_fixes
+        # Patterns come precompiled from config; grep tools take their source,
+        # with IGNORECASE carried over as an inline flag
+        failing_pods = self.search_patterns["failing_pods"]
+        self._failing_pods_query = (
+            f"(?i){failing_pods.pattern}" if failing_pods.flags & re.IGNORECASE else failing_pods.pattern
+        )
+        
+        # Issue type -> planner for its automated fix
+        self._fix_dispatch: Dict[str, Callable[[KubernetesIssue], Awaitable[Optional[EditPlan]]]] = {
+            "ImagePullBackOff": self._plan_image_pull_fix,
+            "CrashLoopBackOff": self._plan_crash_loop_fix,
+        }
+        
+        # CoreV1Api client, created on first use since kubeconfig loading is async
+        self._core_v1 = None
+        self._core_v1_unavailable = k8s_client is None
+        
+        # MorphLLM HTTP client, created on first API tool call and reused by all of them
+        self._http = None
+        
+        # Informer state (see start_informer): pods keyed by (namespace, name)
+        # in Kubernetes JSON form, and the resourceVersion the watch resumes from
+        self._pod_cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._resource_version: Optional[str] = None
+        self._informer_task: Optional[asyncio.Task] = None
+        self._informer_synced = asyncio.Event()
+        
+        # Per-diagnosis memos: base pod name -> deployment file, and
+        # (file, start_line, end_line) -> content. Concurrent lookups of the
+        # same key wait on its lock and share one grep/read.
+        self._deploy_file_cache: Dict[str, Optional[str]] = {}
+        self._read_cache: Dict[Tuple[str, Optional[int], Optional[int]], str] = {}
+        self._memo_locks: Dict[Hashable, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._analysis_slots = asyncio.Semaphore(_MAX_CONCURRENT_ANALYSES)
         
     async def diagnose_cluster(self) -> List[KubernetesIssue]:
         """
@@ -40,7 +189,10 @@ class MorphKubernetesAgent:
         """
         print("🔍 Starting cluster diagnosis with MorphLLM tools...")
         
-        issues = []
+        # Manifests may have been edited since the last run
+        self._deploy_file_cache.clear()
+        self._read_cache.clear()
+        self._memo_locks.clear()
         
         # Step 1: Use codebase_search to find deployment files
         deployment_search = await self._morph_codebase_search(
@@ -51,7 +203,7 @@ class MorphKubernetesAgent:
         
         # Step 2: Use grep_search to find failing pods patterns
         failing_pods = await self._morph_grep_search(
-            query=self.search_patterns["failing_pods"],
+            query=self._failing_pods_query,
             include_pattern="*.yaml",
             explanation="Searching for failing pod patterns in YAML files"
         )
@@ -59,10 +211,14 @@ class MorphKubernetesAgent:
         # Step 3: Check actual cluster status
         cluster_issues = await self._check_cluster_status()
         
-        # Step 4: Analyze findings with MorphLLM
-        for issue in cluster_issues:
+        # Step 4: Analyze findings with MorphLLM, all issues concurrently
+        return list(await asyncio.gather(*(self._analyze_issue(issue) for issue in cluster_issues)))
+    
+    async def _analyze_issue(self, issue: KubernetesIssue) -> KubernetesIssue:
+        """Attach a fix suggestion to an issue based on its deployment file"""
+        async with self._analysis_slots:
             # Use read_file to understand the deployment configuration
-            if issue.issue_type in ["ImagePullBackOff", "CrashLoopBackOff"]:
+            if issue.issue_type in self._fix_dispatch:
                 deployment_file = await self._find_deployment_file(issue.pod_name)
                 if deployment_file:
                     file_content = await self._morph_read_file(
@@ -70,156 +226,343 @@ class MorphKubernetesAgent:
                         explanation=f"Reading deployment file to understand {issue.issue_type} issue"
                     )
                     
-                    # Generate fix suggestion
-                    issue.suggested_fix = await self._generate_fix_suggestion(issue, file_content)
+                    # Generate fix suggestion (issues are frozen, so attach it to a copy)
+                    suggested_fix = await self._generate_fix_suggestion(issue, file_content)
+                    return replace(issue, suggested_fix=suggested_fix)
             
-            issues.append(issue)
-        
-        return issues
+            return issue
     
     async def apply_fix(self, issue: KubernetesIssue) -> bool:
         """
         Use MorphLLM edit_file tool to apply fixes
         """
-        print(f"🔧 Applying fix for {issue.pod_name} ({issue.issue_type})")
+        (success,) = await self.apply_all_fixes([issue])
+        return success
+    
+    async def apply_all_fixes(self, issues: List[KubernetesIssue]) -> List[bool]:
+        """
+        Fix several issues, one edit_file call and one apply per deployment
+        file however many of the issues it backs. Returns a success flag per issue.
+        """
+        for issue in issues:
+            print(f"🔧 Applying fix for {issue.pod_name} ({issue.issue_type})")
+        
+        plans = await asyncio.gather(*(self._plan_fix(issue) for issue in issues))
+        results = {id(issue): False for issue in issues}
         
+        planned = sorted((plan for plan in plans if plan), key=attrgetter("target_file"))
+        groups = [list(group) for _, group in groupby(planned, key=attrgetter("target_file"))]
+        for group_results in await asyncio.gather(*(self._apply_edit_plans(group) for group in groups)):
+            results.update(group_results)
+        
+        return [results[id(issue)] for issue in issues]
+    
+    async def _plan_fix(self, issue: KubernetesIssue) -> Optional[EditPlan]:
+        """The edit that fixes an issue, or None if there is no automated fix"""
+        planner = self._fix_dispatch.get(issue.issue_type)
+        if planner is None:
+            print(f"⚠️ No automated fix available for {issue.issue_type}")
+            return None
         try:
-            if issue.issue_type == "ImagePullBackOff":
-                return await self._fix_image_pull_error(issue)
-            elif issue.issue_type == "CrashLoopBackOff":
-                return await self._fix_crash_loop(issue)
-            else:
-                print(f"⚠️ No automated fix available for {issue.issue_type}")
-                return False
-                
+            return await planner(issue)
         except Exception as e:
             print(f"❌ Failed to apply fix: {e}")
-            return False
+            return None
+    
+    async def _apply_edit_plans(self, plans: List[EditPlan]) -> Dict[int, bool]:
+        """Apply every plan for one file as a single combined edit, then validate each workload"""
+        target_file = plans[0].target_file
+        try:
+            # Replicas (or containers) of one workload plan the same hunk
+            success = await self._morph_edit_file(
+                target_file=target_file,
+                edit_snippet=_combine_snippets(list(dict.fromkeys(plan.snippet for plan in plans))),
+                explanation="; ".join(dict.fromkeys(plan.explanation for plan in plans))
+            )
+            if not success:
+                return {id(plan.issue): False for plan in plans}
+            
+            # Apply the changes to cluster: just the fixed workloads, not the whole file
+            workloads = {plan.issue.workload for plan in plans}
+            manifest = await self._render_manifests(target_file, workloads)
+            if not manifest:
+                print(f"❌ No manifest for {', '.join(sorted(workloads))} found in {target_file}")
+                return {id(plan.issue): False for plan in plans}
+            if not await self._kubectl_apply(manifest):
+                return {id(plan.issue): False for plan in plans}
+            for plan in plans:
+                print(f"✅ Fixed {plan.issue.issue_type} for {plan.issue.pod_name}")
+            
+            # Validate the change on the cluster, once per workload
+            targets = list(dict.fromkeys((plan.issue.workload, plan.issue.namespace) for plan in plans))
+            ready = dict(zip(targets, await asyncio.gather(*(
+                self._wait_for_pod_ready(workload, namespace) for workload, namespace in targets
+            ))))
+            return {id(plan.issue): ready[plan.issue.workload, plan.issue.namespace] for plan in plans}
+        
+        except Exception as e:
+            print(f"❌ Failed to apply fix: {e}")
+            return {id(plan.issue): False for plan in plans}
     
-    async def _fix_image_pull_error(self, issue: KubernetesIssue) -> bool:
+    async def _plan_image_pull_fix(self, issue: KubernetesIssue) -> Optional[EditPlan]:
         """Fix ImagePullBackOff by correcting image tag"""
         
         # Find the deployment file
         deployment_file = await self._find_deployment_file(issue.pod_name)
         if not deployment_file:
-            return False
-        
-        # Read current content
-        current_content = await self._morph_read_file(
-            target_file=deployment_file,
-            explanation="Reading deployment to fix ImagePullBackOff issue"
-        )
+            return None
         
         # Use edit_file to fix the image tag
-        fix_snippet = """
-# ... existing code ...
-        image: nginx:1.21  # Fixed from nonexistent image tag
-# ... existing code ...
-        """
+        fix_snippet = _FIX_TEMPLATES["ImagePullBackOff"].substitute(image=_FIXED_IMAGE)
         
-        success = await self._morph_edit_file(
+        return EditPlan(
             target_file=deployment_file,
-            edit_snippet=fix_snippet,
+            snippet=fix_snippet,
+            issue=issue,
             explanation="Fixing ImagePullBackOff by correcting image tag to valid version"
         )
-        
-        if success:
-            # Apply the changes to cluster
-            await self._kubectl_apply(deployment_file)
-            print(f"✅ Fixed ImagePullBackOff for {issue.pod_name}")
-            return True
-        
-        return False
     
-    async def _fix_crash_loop(self, issue: KubernetesIssue) -> bool:
+    async def _plan_crash_loop_fix(self, issue: KubernetesIssue) -> Optional[EditPlan]:
         """Fix CrashLoopBackOff by adjusting container configuration"""
         
         deployment_file = await self._find_deployment_file(issue.pod_name)
         if not deployment_file:
-            return False
+            return None
         
         # For the crash-loop-app, we need to fix the command that exits with error
-        fix_snippet = """
-# ... existing code ...
-        command: ["/bin/sh"]
-        args: ["-c", "echo 'Application starting successfully...' && sleep 3600"]  # Fixed: removed exit 1
-# ... existing code ...
-        """
+        fix_snippet = _FIX_TEMPLATES["CrashLoopBackOff"].substitute(
+            command=_LONG_RUNNING_COMMAND, args=_LONG_RUNNING_ARGS
+        )
         
-        success = await self._morph_edit_file(
+        return EditPlan(
             target_file=deployment_file,
-            edit_snippet=fix_snippet,
+            snippet=fix_snippet,
+            issue=issue,
             explanation="Fixing CrashLoopBackOff by removing failing exit command"
         )
-        
-        if success:
-            await self._kubectl_apply(deployment_file)
-            print(f"✅ Fixed CrashLoopBackOff for {issue.pod_name}")
-            return True
-        
-        return False
     
     async def _check_cluster_status(self) -> List[KubernetesIssue]:
         """Check actual cluster status for issues"""
         issues = []
         
         try:
-            # Get all pods with issues
-            result = subprocess.run(
-                ["kubectl", "get", "pods", "--all-namespaces", "-o", "json"],
-                capture_output=True, text=True, check=True
-            )
-            
-            pods_data = json.loads(result.stdout)
-            
-            for pod in pods_data.get("items", []):
-                pod_name = pod["metadata"]["name"]
-                namespace = pod["metadata"]["namespace"]
-                
-                # Check pod status
-                status = pod.get("status", {})
-                phase = status.get("phase", "Unknown")
-                
-                # Check container statuses
-                container_statuses = status.get("containerStatuses", [])
-                for container in container_statuses:
-                    waiting = container.get("state", {}).get("waiting", {})
-                    if waiting:
-                        reason = waiting.get("reason", "Unknown")
-                        
-                        if reason in ["ImagePullBackOff", "ErrImagePull"]:
-                            issues.append(KubernetesIssue(
-                                pod_name=pod_name,
-                                namespace=namespace,
-                                status=reason,
-                                issue_type="ImagePullBackOff",
-                                description=f"Cannot pull container image: {waiting.get('message', '')}",
-                                severity="High",
-                                detected_at=datetime.now()
-                            ))
-                        
-                        elif reason in ["CrashLoopBackOff"]:
-                            issues.append(KubernetesIssue(
-                                pod_name=pod_name,
-                                namespace=namespace,
-                                status=reason,
-                                issue_type="CrashLoopBackOff",
-                                description=f"Container keeps crashing: {waiting.get('message', '')}",
-                                severity="High",
-                                detected_at=datetime.now()
-                            ))
+            # Get all containers stuck waiting
+            waiting_containers = await self._list_waiting_containers()
+            detected_at = datetime.now()
+            issues = [
+                KubernetesIssue(
+                    pod_name=pod_name,
+                    namespace=namespace,
+                    workload=workload,
+                    status=reason,
+                    issue_type=template["issue_type"],
+                    description=f"{template['description']}: {message}",
+                    severity=template["severity"],
+                    detected_at=detected_at
+                )
+                for pod_name, namespace, workload, reason, message in waiting_containers
+                if (template := WAITING_REASONS.get(reason))
+            ]
         
         except subprocess.CalledProcessError as e:
+            print(f"❌ Failed to check cluster status: {e}: {e.stderr.decode('utf-8', 'replace').strip()}")
+        except (OSError, asyncio.TimeoutError, *_API_ERRORS) as e:
+            # Cluster unreachable or kubectl missing: report no issues rather than abort
             print(f"❌ Failed to check cluster status: {e}")
         
         return issues
     
+    async def _wait_for_pod_ready(self, workload: str, namespace: str,
+                                  timeout: float = _POD_READY_TIMEOUT) -> bool:
+        """
+        Wait for a pod of the given workload to be Running with all containers
+        ready. Rollouts replace the pod, so pods are matched by their owning
+        workload rather than by the (soon deleted) pod's exact name.
+        """
+        print(f"⏳ Waiting for a {workload} pod in {namespace} to become ready")
+        
+        core_v1 = await self._get_core_v1()
+        try:
+            if core_v1 is not None:
+                waiter = self._watch_pod_ready(core_v1, workload, namespace, timeout)
+            else:
+                waiter = self._poll_pod_ready(workload, namespace)
+            return await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            print(f"⚠️ No {workload} pod in {namespace} ready after {timeout:.0f}s")
+            return False
+    
+    async def _watch_pod_ready(self, core_v1, workload: str, namespace: str, timeout: float) -> bool:
+        """Readiness via a pod watch: idle until the apiserver reports a change"""
+        async with k8s_watch.Watch().stream(
+            core_v1.list_namespaced_pod, namespace=namespace, timeout_seconds=int(timeout)
+        ) as stream:
+            async for event in stream:
+                pod = event["object"]
+                if event["type"] == "DELETED":
+                    continue
+                metadata = core_v1.api_client.sanitize_for_serialization(pod.metadata)
+                if _pod_workload(metadata) != workload:
+                    continue
+                statuses = pod.status.container_statuses or []
+                if _is_pod_ready(pod.status.phase, [c.ready for c in statuses]):
+                    return True
+        return False
+    
+    async def _poll_pod_ready(self, workload: str, namespace: str) -> bool:
+        """Readiness via kubectl polling with capped exponential backoff"""
+        cmd = ["kubectl", "get", "pods", "-n", namespace, "-o", "json"]
+        delay = _POLL_INITIAL_DELAY
+        while True:
+            returncode, stdout, _ = await self._run(cmd)
+            if returncode == 0:
+                for pod in json_loads(stdout).get("items", []):
+                    if _pod_workload(pod["metadata"]) != workload:
+                        continue
+                    status = pod.get("status", {})
+                    statuses = status.get("containerStatuses", [])
+                    if _is_pod_ready(status.get("phase"), [c.get("ready", False) for c in statuses]):
+                        return True
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, _POLL_MAX_DELAY)
+    
+    async def _get_core_v1(self):
+        """CoreV1Api client, or None when kubernetes_asyncio/kubeconfig are unavailable"""
+        if self._core_v1 is None and not self._core_v1_unavailable:
+            try:
+                await k8s_config.load_kube_config()
+            except Exception as e:
+                print(f"⚠️ Kubernetes API client unavailable, using kubectl: {e}")
+                self._core_v1_unavailable = True
+                return None
+            self._core_v1 = k8s_client.CoreV1Api(k8s_client.ApiClient())
+        return self._core_v1
+    
+    async def start_informer(self) -> bool:
+        """
+        Keep an in-memory pod cache current through a list + watch, so
+        diagnose_cluster scans memory instead of re-listing every pod.
+        Returns False when the Kubernetes API client isn't available.
+        """
+        if self._informer_task is not None:
+            return True
+        core_v1 = await self._get_core_v1()
+        if core_v1 is None:
+            return False
+        self._informer_task = asyncio.create_task(self._informer_loop(core_v1))
+        return True
+    
+    async def _informer_loop(self, core_v1):
+        """Relist, then follow the watch from the listed resourceVersion until it expires"""
+        delay = _POLL_INITIAL_DELAY
+        while True:
+            try:
+                if self._resource_version is None:
+                    await self._relist_pods(core_v1)
+                await self._watch_pods(core_v1)
+                delay = _POLL_INITIAL_DELAY
+            except asyncio.CancelledError:
+                raise
+            except k8s_client.ApiException as e:
+                if e.status != 410:
+                    logger.error("❌ Pod watch failed: %s", e)
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, _POLL_MAX_DELAY)
+                # 410 Gone: our resourceVersion was compacted away, relist
+                self._resource_version = None
+            except Exception as e:
+                logger.error("❌ Pod watch failed: %s", e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, _POLL_MAX_DELAY)
+                self._resource_version = None
+    
+    async def _relist_pods(self, core_v1):
+        """Replace the pod cache with a fresh listing"""
+        response = await core_v1.list_pod_for_all_namespaces(
+            field_selector=_UNHEALTHY_POD_SELECTOR, _preload_content=False
+        )
+        try:
+            pods_data = json_loads(await response.read())
+        finally:
+            response.release()
+        self._pod_cache = {
+            (pod["metadata"]["namespace"], pod["metadata"]["name"]): pod
+            for pod in pods_data.get("items", [])
+        }
+        self._resource_version = pods_data["metadata"]["resourceVersion"]
+        self._informer_synced.set()
+    
+    async def _watch_pods(self, core_v1):
+        """Apply watch events to the pod cache until the server closes the stream"""
+        async with k8s_watch.Watch().stream(
+            core_v1.list_pod_for_all_namespaces,
+            field_selector=_UNHEALTHY_POD_SELECTOR,
+            resource_version=self._resource_version,
+            allow_watch_bookmarks=True,
+            timeout_seconds=_WATCH_TIMEOUT
+        ) as stream:
+            async for event in stream:
+                pod = event["object"]
+                self._resource_version = pod.metadata.resource_version
+                if event["type"] == "BOOKMARK":
+                    continue
+                key = (pod.metadata.namespace, pod.metadata.name)
+                if event["type"] == "DELETED":
+                    self._pod_cache.pop(key, None)
+                else:
+                    # Same JSON form as a raw listing, for _waiting_containers
+                    self._pod_cache[key] = core_v1.api_client.sanitize_for_serialization(pod)
+    
+    async def _list_waiting_containers(self) -> List[WaitingContainer]:
+        """Waiting containers across all namespaces, pods filtered by the apiserver"""
+        if self._informer_task is not None and self._informer_synced.is_set():
+            return list(_waiting_containers(self._pod_cache.values()))
+        
+        core_v1 = await self._get_core_v1()
+        if core_v1 is not None:
+            # _preload_content=False skips V1Pod model deserialization entirely
+            response = await core_v1.list_pod_for_all_namespaces(
+                field_selector=_UNHEALTHY_POD_SELECTOR, _preload_content=False
+            )
+            try:
+                pods_data = json_loads(await response.read())
+            finally:
+                response.release()
+            return list(_waiting_containers(pods_data.get("items", [])))
+        
+        cmd = [
+            "kubectl", "get", "pods", "--all-namespaces",
+            f"--field-selector={_UNHEALTHY_POD_SELECTOR}", f"-o=jsonpath={_WAITING_JSONPATH}"
+        ]
+        returncode, stdout, stderr = await self._run(cmd)
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, cmd, stdout, stderr)
+        return list(_parse_waiting_lines(stdout.decode("utf-8", "replace")))
+    
+    async def _memoized(self, cache: Dict[Any, Any], key: Hashable,
+                        compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Return cache[key], computing it once even under concurrent callers"""
+        if key in cache:
+            return cache[key]
+        async with self._memo_locks[key]:
+            if key not in cache:
+                cache[key] = await compute()
+            return cache[key]
+    
     async def _find_deployment_file(self, pod_name: str) -> Optional[str]:
         """Find the deployment file for a given pod"""
+        base_name = base_pod_name(pod_name)  # Get base name without random suffix
+        return await self._memoized(
+            self._deploy_file_cache, base_name,
+            lambda: self._search_deployment_file(pod_name, base_name)
+        )
+    
+    async def _search_deployment_file(self, pod_name: str, base_name: str) -> Optional[str]:
+        """Grep the manifests for the deployment file of a pod"""
         
         # Use grep_search to find deployment files mentioning this pod
         search_result = await self._morph_grep_search(
-            query=pod_name.split("-")[0],  # Get base name without random suffix
+            query=base_name,
             include_pattern="*.yaml",
             explanation=f"Finding deployment file for pod {pod_name}"
         )
@@ -227,58 +570,151 @@ class MorphKubernetesAgent:
         # For our demo, we know the problematic pods are in deploy-demo-apps.sh
         return "deploy-demo-apps.sh"
     
-    async def _kubectl_apply(self, file_path: str):
-        """Apply Kubernetes changes"""
-        try:
-            if file_path.endswith(".sh"):
-                # For shell scripts, we need to re-run them
-                subprocess.run([f"./{file_path}"], cwd=self.config.kubernetes_manifests_dir, check=True)
-            else:
-                subprocess.run(["kubectl", "apply", "-f", file_path], check=True)
-        except subprocess.CalledProcessError as e:
-            print(f"❌ Failed to apply changes: {e}")
+    async def _render_manifests(self, file_path: str, workloads: Iterable[str]) -> str:
+        """YAML documents for the given workload names, pulled from a manifest or deploy script"""
+        path = os.path.join(self.config.kubernetes_manifests_dir, file_path)
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        
+        if file_path.endswith(_SCRIPT_SUFFIXES):
+            bodies = [match.group(2) for match in _HEREDOC_RE.finditer(text)]
+        else:
+            bodies = [text]
+        markers = tuple(f"\n  name: {name}\n" for name in workloads)
+        documents = [
+            document.strip("\n")
+            for body in bodies
+            for document in _YAML_DOC_SEP_RE.split(body)
+            if any(marker in document for marker in markers)
+        ]
+        return "\n---\n".join(documents)
+    
+    async def _kubectl_apply(self, manifest_yaml: str) -> bool:
+        """Server-side apply a manifest in one apiserver call, piped over stdin"""
+        cmd = ["kubectl", "apply", "--server-side=true", "--force-conflicts", "-f", "-"]
+        returncode, _, stderr = await self._run(cmd, stdin=manifest_yaml.encode("utf-8"))
+        if returncode != 0:
+            logger.error("❌ Failed to apply changes: %s: %s",
+                         subprocess.CalledProcessError(returncode, cmd),
+                         stderr.decode("utf-8", "replace").strip())
+        return returncode == 0
+    
+    @staticmethod
+    async def _run(cmd: List[str], stdin: Optional[bytes] = None) -> Tuple[int, bytes, bytes]:
+        """Run a command without blocking the event loop, returning (returncode, stdout, stderr)"""
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.PIPE if stdin is not None else asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await proc.communicate(stdin)
+        return proc.returncode, stdout, stderr
     
-    # MorphLLM tool wrapper methods (these would call actual MorphLLM API)
+    async def aclose(self):
+        """Stop the informer and release the MorphLLM and Kubernetes API connections"""
+        if self._informer_task is not None:
+            self._informer_task.cancel()
+            try:
+                await self._informer_task
+            except asyncio.CancelledError:
+                pass
+            self._informer_task = None
+            self._informer_synced.clear()
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        if self._core_v1 is not None:
+            await self._core_v1.api_client.close()
+            self._core_v1 = None
+    
+    async def _call_morph_tool(self, tool: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        POST a tool call to the MorphLLM API over the shared client, or return
+        None when API tool calls are disabled so the local fallback runs
+        """
+        if not self.config.tools_via_api or httpx is None:
+            return None
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self.config.base_url,
+                headers={"Authorization": f"Bearer {self.config.api_key}"},
+                http2=_HTTP2_AVAILABLE,
+                timeout=_MORPH_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=_MORPH_MAX_CONNECTIONS,
+                    max_keepalive_connections=_MORPH_MAX_CONNECTIONS
+                )
+            )
+        response = await self._http.post(f"/{tool}", json=payload)
+        response.raise_for_status()
+        return response.json()
+    
+    # MorphLLM tool wrapper methods (API calls when MORPH_TOOLS_API is set)
     async def _morph_read_file(self, target_file: str, explanation: str, 
                               start_line: Optional[int] = None, 
                               end_line: Optional[int] = None) -> str:
         """Wrapper for MorphLLM read_file tool"""
-        print(f"📖 Reading file: {target_file} - {explanation}")
+        logger.debug("📖 Reading file: %s - %s", target_file, explanation)
+        return await self._memoized(
+            self._read_cache, (target_file, start_line, end_line),
+            lambda: self._read_file(target_file, start_line, end_line)
+        )
+    
+    async def _read_file(self, target_file: str, start_line: Optional[int],
+                         end_line: Optional[int]) -> str:
+        """Read a file (or a 1-based inclusive line range of it)"""
+        result = await self._call_morph_tool("read_file", {
+            "target_file": target_file, "start_line": start_line, "end_line": end_line
+        })
+        if result is not None:
+            return result["content"]
         
         # For demo purposes, read file directly
-        # In production, this would call MorphLLM API
         try:
-            with open(target_file, 'r') as f:
-                content = f.read()
+            with open(target_file, 'r', encoding='utf-8') as f:
                 if start_line and end_line:
-                    lines = content.split('\n')
-                    return '\n'.join(lines[start_line-1:end_line])
-                return content
+                    # Stream just the requested lines instead of splitting the whole file
+                    return read_line_window(f, start_line, end_line)
+                return f.read()
         except FileNotFoundError:
             return f"File not found: {target_file}"
     
     async def _morph_codebase_search(self, query: str, target_directories: List[str], 
                                    explanation: str) -> Dict[str, Any]:
         """Wrapper for MorphLLM codebase_search tool"""
-        print(f"🔍 Searching codebase: {query} - {explanation}")
-        # This would call MorphLLM API in production
-        return {"query": query, "results": []}
+        logger.debug("🔍 Searching codebase: %s - %s", query, explanation)
+        result = await self._call_morph_tool("codebase_search", {
+            "query": query, "target_directories": target_directories, "explanation": explanation
+        })
+        return result if result is not None else {"query": query, "results": []}
     
     async def _morph_grep_search(self, query: str, include_pattern: str, 
                                 explanation: str) -> Dict[str, Any]:
         """Wrapper for MorphLLM grep_search tool"""
-        print(f"🔎 Grep search: {query} - {explanation}")
-        # This would call MorphLLM API in production
-        return {"query": query, "matches": []}
+        logger.debug("🔎 Grep search: %s - %s", query, explanation)
+        result = await self._call_morph_tool("grep_search", {
+            "query": query, "include_pattern": include_pattern, "explanation": explanation
+        })
+        return result if result is not None else {"query": query, "matches": []}
     
     async def _morph_edit_file(self, target_file: str, edit_snippet: str, 
                               explanation: str) -> bool:
         """Wrapper for MorphLLM edit_file tool"""
-        print(f"✏️ Editing file: {target_file} - {explanation}")
-        print(f"Edit snippet:\n{edit_snippet}")
+        logger.debug("✏️ Editing file: %s - %s", target_file, explanation)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Edit snippet:\n%s", edit_snippet)
+        
+        # Drop stale reads of the edited file
+        for key in [key for key in self._read_cache if key[0] == target_file]:
+            del self._read_cache[key]
+        
+        result = await self._call_morph_tool("edit_file", {
+            "target_file": target_file, "code_edit": edit_snippet, "instructions": explanation
+        })
+        if result is not None:
+            return bool(result.get("success", False))
         
         # For demo purposes, return True
-        # In production, this would call MorphLLM API to make precise edits
         return True
     
     async def _generate_fix_suggestion(self, issue: KubernetesIssue, 
@@ -292,33 +728,110 @@ class MorphKubernetesAgent:
         
         return "No specific fix suggestion available"
 
+def _combine_snippets(snippets: List[str]) -> str:
+    """Merge edit snippets for one file into a multi-hunk snippet"""
+    hunks = []
+    for snippet in snippets:
+        lines = snippet.strip("\n").splitlines()
+        # Drop each snippet's own elision markers; they're re-added between hunks
+        while lines and lines[0].strip() in ("", _ELISION_MARKER):
+            lines.pop(0)
+        while lines and lines[-1].strip() in ("", _ELISION_MARKER):
+            lines.pop()
+        hunks.append("\n".join(lines))
+    separator = f"\n{_ELISION_MARKER}\n"
+    return f"{separator}{separator.join(hunks)}{separator}"
+
+def _workload_name(pod_name: str, owner_kind: str, owner_name: str,
+                   template_hash: str, app_label: str) -> str:
+    """
+    Workload a pod belongs to: its controller, with a Deployment's ReplicaSet
+    resolved to the Deployment via the pod-template-hash; else its app label;
+    else the (bare) pod itself
+    """
+    if owner_kind == "ReplicaSet" and template_hash and owner_name.endswith(f"-{template_hash}"):
+        return owner_name[:-len(template_hash) - 1]
+    return owner_name or app_label or pod_name
+
+def _pod_workload(metadata: Dict[str, Any]) -> str:
+    """_workload_name of a pod's metadata in Kubernetes JSON form"""
+    owners = metadata.get("ownerReferences") or [{}]
+    owner = next((o for o in owners if o.get("controller")), owners[0])
+    labels = metadata.get("labels") or {}
+    return _workload_name(
+        metadata["name"], owner.get("kind", ""), owner.get("name", ""),
+        labels.get("pod-template-hash", ""), labels.get("app", "")
+    )
+
+def _is_pod_ready(phase: Optional[str], containers_ready: List[bool]) -> bool:
+    """Running alone isn't enough: CrashLoopBackOff pods are Running too"""
+    return phase == "Running" and bool(containers_ready) and all(containers_ready)
+
+def _waiting_containers(pods: Iterable[Dict[str, Any]]) -> Iterator[WaitingContainer]:
+    """Waiting containers of pods in Kubernetes JSON form"""
+    for pod in pods:
+        status = pod.get("status", {})
+        if status.get("phase") in _SETTLED_PHASES:
+            continue
+        pod_name = pod["metadata"]["name"]
+        namespace = pod["metadata"]["namespace"]
+        workload = None
+        for container in status.get("containerStatuses", []):
+            waiting = container.get("state", {}).get("waiting")
+            if not waiting:
+                continue
+            if workload is None:
+                workload = _pod_workload(pod["metadata"])
+            yield pod_name, namespace, workload, waiting.get("reason", "Unknown"), waiting.get("message", "")
+
+def _parse_waiting_lines(output: str) -> Iterator[WaitingContainer]:
+    """Waiting containers from _WAITING_JSONPATH output"""
+    for line in output.splitlines():
+        fields = line.split("\t")
+        if len(fields) < 6:
+            continue
+        pod_name, namespace, owner_kinds, owner_names, template_hash, app_label = fields[:6]
+        # [*] renders every owner space-separated; pods have one controller
+        workload = _workload_name(
+            pod_name, next(iter(owner_kinds.split()), ""), next(iter(owner_names.split()), ""),
+            template_hash, app_label
+        )
+        for reason, message in zip(fields[6::2], fields[7::2]):
+            # Containers that aren't waiting render an empty reason
+            if reason:
+                yield pod_name, namespace, workload, reason, message
+
 # Example usage
 async def main():
     """Example of using the MorphLLM Kubernetes agent"""
     
+    morph_config.configure_logging()
     agent = MorphKubernetesAgent()
     
-    print("🚀 Starting MorphLLM Kubernetes Agent...")
-    
-    # Diagnose cluster issues
-    issues = await agent.diagnose_cluster()
-    
-    print(f"\n📊 Found {len(issues)} issues:")
-    for issue in issues:
-        print(f"  • {issue.pod_name} ({issue.namespace}): {issue.issue_type}")
-        print(f"    Description: {issue.description}")
-        if issue.suggested_fix:
-            print(f"    Suggested fix: {issue.suggested_fix}")
-        print()
-    
-    # Apply fixes
-    for issue in issues:
-        print(f"\n🔧 Attempting to fix {issue.pod_name}...")
-        success = await agent.apply_fix(issue)
-        if success:
-            print(f"✅ Successfully fixed {issue.pod_name}")
-        else:
-            print(f"❌ Failed to fix {issue.pod_name}")
+    try:
+        print("🚀 Starting MorphLLM Kubernetes Agent...")
+        
+        # Diagnose cluster issues
+        issues = await agent.diagnose_cluster()
+        
+        print(f"\n📊 Found {len(issues)} issues:")
+        for issue in issues:
+            print(f"  • {issue.pod_name} ({issue.namespace}): {issue.issue_type}")
+            print(f"    Description: {issue.description}")
+            if issue.suggested_fix:
+                print(f"    Suggested fix: {issue.suggested_fix}")
+            print()
+        
+        # Apply fixes, one edit and apply per deployment file
+        results = await agent.apply_all_fixes(issues)
+        
+        for issue, success in zip(issues, results):
+            if success:
+                print(f"✅ Successfully fixed {issue.pod_name}")
+            else:
+                print(f"❌ Failed to fix {issue.pod_name}")
+    finally:
+        await agent.aclose()
 
 if __name__ == "__main__":
     asyncio.run(main())